@@ -0,0 +1,43 @@
+"""Add composite indexes for the deployment-history and app-list queries
+
+Revision ID: c7d8e9f0a1b2
+Revises: b1c2d3e4f5a6
+Create Date: 2026-10-14
+
+Why this migration exists:
+    DeploymentRepository.list_by_application filters on application_id and
+    sorts by started_at DESC; ApplicationRepository.list_by_tenant does the
+    same with tenant_id / created_at. Without a composite index the database
+    fetches every matching row and sorts it.
+
+    On PostgreSQL 11+ the deployments index INCLUDEs the columns the UI
+    displays, so the history list becomes an index-only scan.
+    SQLite ignores postgresql_include and builds a plain composite index.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers
+revision: str = 'c7d8e9f0a1b2'
+down_revision: Union[str, None] = 'b1c2d3e4f5a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_deployment_app_started', 'deployments',
+        ['application_id', 'started_at'],
+        postgresql_include=['status', 'short_id', 'deployment_url', 'duration_seconds'],
+    )
+    op.create_index(
+        'ix_app_tenant_created', 'applications',
+        ['tenant_id', 'created_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_app_tenant_created', table_name='applications')
+    op.drop_index('ix_deployment_app_started', table_name='deployments')
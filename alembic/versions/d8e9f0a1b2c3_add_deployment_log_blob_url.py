@@ -0,0 +1,31 @@
+"""Add deployment_logs.blob_url for build output stored in S3
+
+Revision ID: d8e9f0a1b2c3
+Revises: c7d8e9f0a1b2
+Create Date: 2026-10-14
+
+Why this migration exists:
+    Log rows are now capped at 4KB. Full docker build output is uploaded to
+    S3 as one object per deployment, and the log row records only its URL.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision: str = 'd8e9f0a1b2c3'
+down_revision: Union[str, None] = 'c7d8e9f0a1b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('deployment_logs') as batch_op:
+        batch_op.add_column(sa.Column('blob_url', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('deployment_logs') as batch_op:
+        batch_op.drop_column('blob_url')
@@ -0,0 +1,29 @@
+"""Add (deployment_id, id) index on deployment_logs for keyset pagination
+
+Revision ID: e9f0a1b2c3d4
+Revises: d8e9f0a1b2c3
+Create Date: 2026-10-14
+
+Why this migration exists:
+    Log tailing now fetches WHERE deployment_id = :dep AND id > :after_id
+    ORDER BY id. A composite index lets each poll range-scan from the last
+    row the client saw instead of re-reading the whole deployment's log.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers
+revision: str = 'e9f0a1b2c3d4'
+down_revision: Union[str, None] = 'd8e9f0a1b2c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_deployment_log_dep_id', 'deployment_logs', ['deployment_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deployment_log_dep_id', table_name='deployment_logs')
@@ -79,7 +79,17 @@ def get_application(app_id):
         return jsonify({
             'success': True,
             'application': app_obj.to_dict(),
-            'recent_deployments': [d.to_dict() for d in recent],
+            'recent_deployments': [
+                {
+                    'id':               d.id,
+                    'short_id':         d.short_id,
+                    'status':           d.status,
+                    'started_at':       d.started_at.isoformat() if d.started_at else None,
+                    'duration_seconds': d.duration_seconds,
+                    'deployment_url':   d.deployment_url,
+                }
+                for d in recent
+            ],
         })
     except Exception as e:
         logger.error('get_application error: %s', e)
@@ -160,14 +160,17 @@ def get_deployment_logs(deployment_id):
     """
     Get log lines for a deployment (paginated).
     Query params:
-        limit  (int, default 500) — lines per page
-        after  (str, optional)    — ISO timestamp; return only lines after this time
-        level  (str, optional)    — filter by log level (INFO/WARNING/ERROR)
+        limit    (int, default 500) — lines per page
+        after_id (int, default 0)   — return only lines with id > after_id;
+                                      pass back next_after_id to tail new lines
+        after    (str, optional)    — ISO timestamp; return only lines after this time
+        level    (str, optional)    — filter by log level (INFO/WARNING/ERROR)
     """
     try:
-        limit = min(int(request.args.get('limit', 500)), 2000)
-        after = request.args.get('after')
-        level = request.args.get('level')
+        limit    = min(int(request.args.get('limit', 500)), 2000)
+        after_id = int(request.args.get('after_id', 0))
+        after    = request.args.get('after')
+        level    = request.args.get('level')
 
         db   = db_session()
         repo = DeploymentRepository(db)
@@ -177,8 +180,9 @@ def get_deployment_logs(deployment_id):
             return jsonify({'success': False, 'error': 'Deployment not found'}), 404
 
         q = (db.query(DeploymentLog)
-             .filter_by(deployment_id=dep.id)
-             .order_by(DeploymentLog.timestamp.asc()))
+             .filter(DeploymentLog.deployment_id == dep.id,
+                     DeploymentLog.id > after_id)
+             .order_by(DeploymentLog.id.asc()))
 
         if after:
             after_dt = datetime.fromisoformat(after)
@@ -192,6 +196,7 @@ def get_deployment_logs(deployment_id):
             'success': True,
             'deployment_id': dep.short_id,
             'count': len(logs),
+            'next_after_id': logs[-1].id if logs else after_id,
             'logs': [
                 {
                     'level':     l.log_level,
@@ -42,9 +42,16 @@ class Config:
     MAX_DEPLOYMENT_TIME = int(os.getenv('MAX_DEPLOYMENT_TIME', '600'))
     HEALTH_CHECK_INTERVAL = int(os.getenv('HEALTH_CHECK_INTERVAL', '10'))
     HEALTH_CHECK_RETRIES = int(os.getenv('HEALTH_CHECK_RETRIES', '5'))
+    # Terminate the EC2 instance of a failed deployment (off: kept for debugging)
+    TERMINATE_ON_FAILURE = os.getenv('TERMINATE_ON_FAILURE', 'false').lower() == 'true'
+    
+    # S3 bucket for full build output (optional — unset keeps only truncated log rows)
+    DEPLOYMENT_LOG_BUCKET = os.getenv('DEPLOYMENT_LOG_BUCKET')
     
     # GitHub Configuration
     GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
+    # Local bare-repo cache; when set, repos are streamed to instances via git archive
+    GITHUB_CACHE_DIR = os.getenv('GITHUB_CACHE_DIR')
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -56,6 +63,9 @@ class Config:
     NGINX_HTTPS_PORT = int(os.getenv('NGINX_HTTPS_PORT', '443'))
     ENABLE_SSL = os.getenv('ENABLE_SSL', 'false').lower() == 'true'
     SSL_EMAIL = os.getenv('SSL_EMAIL', '')
+    # Pre-staged nginx .deb (https:// or s3://); when set it is installed
+    # with dpkg instead of apt, falling back to apt if that fails
+    NGINX_DEB_URL = os.getenv('NGINX_DEB_URL')
     
     # Security Group Rules
     @classmethod
@@ -3,14 +3,32 @@ Utility functions for the Automated Deployment Framework.
 Provides SSH connection, remote command execution, and helper utilities.
 """
 
+import atexit
+import shlex
 import time
 import logging
+import threading
 import paramiko
-from typing import Tuple, Optional, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, BinaryIO, Callable, Dict, Tuple, Optional, List, Union
 import requests
 
 logger = logging.getLogger(__name__)
 
+# Written into pre-baked AMIs (Docker + git already installed); see the
+# Packer recipe in providers/docker/docker_manager.py
+PREBAKED_AMI_MARKER = '/etc/deploy-framework-ami'
+
+
+class RemoteCommandError(RuntimeError):
+    """A remote command exited non-zero (raised by SSHClient.run_checked)."""
+    
+    def __init__(self, command: str, exit_code: int, output: str):
+        super().__init__(output.strip() or f"'{command}' exited with code {exit_code}")
+        self.command = command
+        self.exit_code = exit_code
+        self.output = output
+
 
 class SSHClient:
     """Wrapper for SSH connections and remote command execution."""
@@ -33,6 +51,7 @@ class SSHClient:
             
         self.key_file = key_file
         self.client = None
+        self._prebaked_marker = None   # cached check_prebaked() result
         
     def connect(self, max_wait: int = 300, retry_interval: int = 5, 
                 progress_callback: Optional[callable] = None) -> None:
@@ -51,6 +70,11 @@ class SSHClient:
         """
         import socket
         
+        # Already connected (e.g. a client shared through SSHConnectionPool)
+        if self.is_connected():
+            logger.debug(f"Reusing SSH connection to {self.hostname}")
+            return
+        
         start_time = time.time()
         max_attempts = max_wait // retry_interval
         attempt = 0
@@ -179,6 +203,11 @@ class SSHClient:
                     
                 time.sleep(retry_interval)
     
+    def is_connected(self) -> bool:
+        """Return True if the underlying transport is up."""
+        transport = self.client.get_transport() if self.client else None
+        return bool(transport and transport.is_active())
+    
     def _classify_ssh_error(self, error: Exception) -> str:
         """
         Classify SSH connection errors for user-friendly messages.
@@ -206,24 +235,37 @@ class SSHClient:
         else:
             return "SSH not ready"
     
-    def execute_command(self, command: str, timeout: int = 300) -> Tuple[int, str, str]:
+    def execute_command(self, command: Union[str, bytes], timeout: Optional[int] = 300,
+                        stream: bool = False):
         """
         Execute a command on the remote server.
         
         Args:
-            command: Command to execute
-            timeout: Command timeout in seconds
+            command: Command to execute; bytes are sent to the channel as-is
+                     (no per-call encode for constant commands)
+            timeout: Command timeout in seconds (None = no timeout)
+            stream: Return the channel's stdout/stderr file objects right away
+                    instead of waiting for the command and reading everything
+                    into memory. The caller reads them (e.g. line by line)
+                    and closes the channel.
             
         Returns:
-            Tuple of (exit_code, stdout, stderr)
+            Tuple of (exit_code, stdout, stderr), or
+            Tuple of (stdout_file, stderr_file) when stream=True
         """
         if not self.client:
             raise Exception("SSH client not connected")
         
         try:
-            logger.info(f"Executing command: {command}")
+            if isinstance(command, bytes):
+                logger.info(f"Executing command: {command.decode('utf-8', 'replace')}")
+            else:
+                logger.info(f"Executing command: {command}")
             stdin, stdout, stderr = self.client.exec_command(command, timeout=timeout)
             
+            if stream:
+                return stdout, stderr
+            
             exit_code = stdout.channel.recv_exit_status()
             stdout_text = stdout.read().decode('utf-8')
             stderr_text = stderr.read().decode('utf-8')
@@ -239,6 +281,102 @@ class SSHClient:
             logger.error(f"Error executing command: {str(e)}")
             raise
     
+    def try_execute(self, command: Union[str, bytes], timeout: Optional[int] = 300,
+                    default: Tuple[int, str, str] = (127, "", "")) -> Tuple[int, str, str]:
+        """
+        Execute a command, returning `default` instead of raising on SSH errors.
+        
+        For probes polled while a host is still coming up, where "could not
+        reach it" and "not there yet" mean the same thing to the caller.
+        
+        Args:
+            command: Command to execute
+            timeout: Command timeout in seconds
+            default: Result returned if the command could not be run
+            
+        Returns:
+            Tuple of (exit_code, stdout, stderr), or default
+        """
+        try:
+            return self.execute_command(command, timeout=timeout)
+        except Exception:
+            return default
+    
+    def check_prebaked(self) -> Optional[str]:
+        """
+        Check whether the host was launched from a pre-baked framework AMI.
+        
+        One SSH probe per host; the answer is cached on this client.
+        
+        Returns:
+            Contents of the AMI marker file (e.g. its build id), or None
+        """
+        if self._prebaked_marker is None:
+            exit_code, stdout, _ = self.execute_command(
+                f"test -f {PREBAKED_AMI_MARKER} && cat {PREBAKED_AMI_MARKER}")
+            self._prebaked_marker = (stdout.strip() or 'prebaked') if exit_code == 0 else ''
+        return self._prebaked_marker or None
+    
+    def run_checked(self, command: str, timeout: int = 300) -> str:
+        """
+        Execute a command with stderr merged into stdout; raise if it fails.
+        
+        Only one stream has to be received and decoded, and callers need no
+        exit-code/stdout/stderr bookkeeping for the common "run it, use the
+        output" case.
+        
+        Args:
+            command: Command to execute
+            timeout: Command timeout in seconds
+            
+        Returns:
+            Combined output of the command
+            
+        Raises:
+            RemoteCommandError: Command exited non-zero (message = its output)
+        """
+        exit_code, output, _ = self.execute_command(f"{{ {command}\n}} 2>&1", timeout=timeout)
+        if exit_code != 0:
+            raise RemoteCommandError(command, exit_code, output)
+        return output
+    
+    def execute_command_with_input(self, command: str, source: BinaryIO,
+                                   timeout: int = 300,
+                                   chunk_size: int = 64 * 1024) -> Tuple[int, str, str]:
+        """
+        Execute a command on the remote server, streaming `source` to its stdin.
+        
+        Args:
+            command: Command to execute (e.g. `tar -x -C /dest`)
+            source: Binary file-like object read in chunks until EOF
+            timeout: Command timeout in seconds
+            chunk_size: Bytes per write
+            
+        Returns:
+            Tuple of (exit_code, stdout, stderr)
+        """
+        if not self.client:
+            raise Exception("SSH client not connected")
+        
+        try:
+            logger.info(f"Executing command with streamed input: {command}")
+            stdin, stdout, stderr = self.client.exec_command(command, timeout=timeout)
+            
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                stdin.write(chunk)
+            stdin.flush()
+            stdin.channel.shutdown_write()   # EOF for the remote process
+            
+            exit_code = stdout.channel.recv_exit_status()
+            return exit_code, stdout.read().decode('utf-8'), stderr.read().decode('utf-8')
+            
+        except Exception as e:
+            logger.error(f"Error executing command: {str(e)}")
+            raise
+    
     def execute_commands(self, commands: List[str], stop_on_error: bool = True) -> List[Tuple[int, str, str]]:
         """
         Execute multiple commands sequentially.
@@ -262,6 +400,70 @@ class SSHClient:
         
         return results
     
+    def execute_script(self, commands: List[str], timeout: int = 900) -> Tuple[int, str, str]:
+        """
+        Run several shell commands as ONE remote bash script.
+        
+        Unlike execute_commands(), which opens a new exec channel per command,
+        the whole list is shipped in a single exec, so N commands cost one
+        round trip. The script runs with `set -euxo pipefail`: it stops at the
+        first failing command, and the xtrace on stderr shows which one it was.
+        It is passed to bash as an argument with stdin from /dev/null, so a
+        command that reads stdin (apt, dpkg, sudo) cannot swallow the lines
+        after it.
+        
+        Args:
+            commands: Shell commands, run in order
+            timeout: Timeout for the whole script in seconds
+            
+        Returns:
+            Tuple of (exit_code, stdout, stderr)
+        """
+        script = "set -euxo pipefail\n" + "\n".join(commands)
+        return self.execute_command(f"bash -c {shlex.quote(script)} </dev/null", timeout=timeout)
+    
+    def run_batch(self, commands: List[str], timeout: int = 300,
+                  stop_on_error: bool = True) -> List[Tuple[int, str, str]]:
+        """
+        Run several commands over ONE exec channel, keeping per-command results.
+        
+        After each command a sentinel line carrying its exit code is written to
+        both stdout and stderr; the combined output is split on it afterwards.
+        Same return shape as execute_commands(), but one round trip in total.
+        
+        Args:
+            commands: Commands to execute, in order
+            timeout: Timeout for the whole batch in seconds
+            stop_on_error: Stop the batch at the first non-zero exit code
+            
+        Returns:
+            List of tuples (exit_code, stdout, stderr) for each command that ran
+        """
+        import re
+        import uuid
+        
+        marker = f"__RC_{uuid.uuid4().hex[:12]}__"
+        lines = []
+        for cmd in commands:
+            lines.append(f"{{ {cmd}\n}}; rc=$?")
+            lines.append(f"printf '\\n{marker} %d\\n' $rc; printf '\\n{marker} %d\\n' $rc >&2")
+            if stop_on_error:
+                lines.append('[ "$rc" -eq 0 ] || exit "$rc"')
+        
+        _, stdout_text, stderr_text = self.execute_command("\n".join(lines), timeout=timeout)
+        
+        pattern = re.compile(rf"\n{marker} (\d+)\n")
+        out_parts = pattern.split(stdout_text)
+        err_parts = pattern.split(stderr_text)
+        
+        # split() yields [out0, rc0, out1, rc1, ..., trailing]
+        results = []
+        for i in range(0, len(out_parts) - 1, 2):
+            err = err_parts[i] if i < len(err_parts) else ''
+            results.append((int(out_parts[i + 1]), out_parts[i], err))
+        
+        return results
+    
     def close(self):
         """Close SSH connection."""
         if self.client:
@@ -269,6 +471,169 @@ class SSHClient:
             logger.info(f"SSH connection to {self.hostname} closed")
 
 
+class SSHConnectionPool:
+    """
+    One shared SSHClient per (hostname, username, key_file).
+    
+    DockerManager, GitHubManager and NginxManager all talk to the same
+    instance during a deployment; going through the pool means one TCP
+    connection, key exchange and auth instead of one per manager, and only
+    the first connect() runs the retry loop. Clients are reference-counted.
+    When the last user releases one it stays open for `idle_timeout`
+    seconds, so a redeploy to the same host right after reuses it; after
+    that (or when more than `max_idle` are parked, oldest first) it is closed.
+    
+        ssh = SSHConnectionPool.get(ip, key_file='key.pem')
+        ...
+        SSHConnectionPool.release(ssh)
+    """
+    
+    idle_timeout = 60   # seconds an unreferenced connection is kept open
+    max_idle = 16
+    
+    _lock = threading.Lock()
+    _clients: Dict[Tuple, SSHClient] = {}
+    _refcounts: Dict[Tuple, int] = {}
+    _idle_since: Dict[Tuple, float] = {}   # insertion order = LRU order
+    
+    @classmethod
+    def get(cls, hostname: str, username: str = 'ubuntu',
+            key_file: Optional[str] = None) -> SSHClient:
+        """
+        Get the shared client for a host, creating it on first use.
+        
+        Args:
+            hostname: EC2 instance public IP or DNS
+            username: SSH username
+            key_file: Path to private key file
+            
+        Returns:
+            SSHClient (connect() is a no-op once it is connected)
+        """
+        key = (hostname, username, key_file)
+        with cls._lock:
+            ssh = cls._clients.get(key)
+            if ssh is None:
+                ssh = SSHClient(hostname, username, key_file)
+                ssh._pool_key = key
+                cls._clients[key] = ssh
+                cls._refcounts[key] = 0
+            cls._idle_since.pop(key, None)
+            cls._refcounts[key] += 1
+            return ssh
+    
+    @classmethod
+    def release(cls, ssh: SSHClient):
+        """
+        Drop one reference; park the connection as idle when none are left.
+        
+        Args:
+            ssh: Client returned by get()
+        """
+        key = getattr(ssh, '_pool_key', None)
+        parked = False
+        with cls._lock:
+            if key not in cls._refcounts:
+                # Not pooled (or already evicted)
+                to_close = [ssh]
+            else:
+                cls._refcounts[key] -= 1
+                if cls._refcounts[key] > 0:
+                    return
+                cls._idle_since[key] = time.monotonic()
+                to_close = cls._pop_evicted()
+                parked = key in cls._idle_since
+        
+        for client in to_close:
+            client.close()
+        
+        if parked:
+            # Closes it if nobody picked it up again in the meantime
+            timer = threading.Timer(cls.idle_timeout + 1, cls.evict_idle)
+            timer.daemon = True
+            timer.start()
+    
+    @classmethod
+    def _pop_evicted(cls, force: bool = False) -> List[SSHClient]:
+        """
+        Remove expired / over-limit idle clients (caller holds the lock).
+        
+        Args:
+            force: Evict every idle client regardless of age
+            
+        Returns:
+            Clients to close once the lock is released
+        """
+        now = time.monotonic()
+        excess = len(cls._idle_since) - cls.max_idle
+        evicted = []
+        for key, since in list(cls._idle_since.items()):
+            if force or excess > 0 or now - since >= cls.idle_timeout:
+                excess -= 1
+                del cls._idle_since[key]
+                del cls._refcounts[key]
+                evicted.append(cls._clients.pop(key))
+        return evicted
+    
+    @classmethod
+    def evict_idle(cls):
+        """Close idle connections older than idle_timeout."""
+        with cls._lock:
+            to_close = cls._pop_evicted()
+        for client in to_close:
+            client.close()
+    
+    @classmethod
+    def close_all(cls):
+        """Close every pooled connection, in use or not (process shutdown)."""
+        with cls._lock:
+            to_close = list(cls._clients.values())
+            cls._clients.clear()
+            cls._refcounts.clear()
+            cls._idle_since.clear()
+        for client in to_close:
+            client.close()
+
+
+atexit.register(SSHConnectionPool.close_all)
+
+
+def run_on_hosts(managers: Dict[str, Any], operation: Callable[[Any], Tuple[bool, str]],
+                 name: str, max_workers: int) -> Dict[str, Tuple[bool, str]]:
+    """
+    Run operation(manager) for every host on a thread pool.
+    
+    Shared by DeployPool and NginxPool. An exception on one host is
+    reported as that host's failure and does not affect the others.
+    
+    Args:
+        managers: {hostname: manager}
+        operation: Callable taking a manager, returning (success, message)
+        name: Operation name for log messages
+        max_workers: Hosts handled concurrently
+        
+    Returns:
+        Dictionary of {hostname: (success, message)}
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(operation, manager): host
+                   for host, manager in managers.items()}
+        for future in as_completed(futures):
+            host = futures[future]
+            try:
+                results[host] = future.result()
+            except Exception as e:
+                results[host] = (False, f"Error during {name}: {str(e)}")
+            
+            if not results[host][0]:
+                logger.error(f"[{host}] {name} failed: {results[host][1]}")
+    
+    ok = sum(1 for success, _ in results.values() if success)
+    logger.info(f"{name}: {ok}/{len(results)} hosts succeeded")
+    return results
+
+
 def wait_for_ssh(hostname: str, username: str = 'ubuntu', key_file: Optional[str] = None, 
                  max_wait: int = 300, retry_interval: int = 5,
                  progress_callback: Optional[callable] = None) -> SSHClient:
@@ -74,6 +74,7 @@ def _create_engine():
             DATABASE_URL,
             pool_size=20,           # max connections in pool
             max_overflow=40,        # extra connections above pool_size
+            pool_timeout=30,        # seconds to wait for a free connection before erroring
             pool_pre_ping=True,     # verify connection health before use
             pool_recycle=3600,      # recycle connections every hour (avoid stale connections)
             echo=False,
@@ -84,6 +85,14 @@ def _create_engine():
 
 engine = _create_engine()
 
+# ── Fork safety ───────────────────────────────────────────────────────────────
+# A forked worker (gunicorn --preload, multiprocessing) inherits the parent's
+# pooled connections; two processes talking over one socket corrupts both
+# ("server closed the connection unexpectedly"). Give the child a fresh,
+# empty pool. close=False leaves the parent's connections alone.
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
 # ── Session factory ───────────────────────────────────────────────────────────
 # sessionmaker = factory that creates new Session objects
 # scoped_session = thread-safe wrapper (one session per thread)
@@ -21,7 +21,7 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import (
-    Boolean, BigInteger, Column, DateTime, ForeignKey,
+    Boolean, BigInteger, Column, DateTime, ForeignKey, Index,
     Integer, String, Text, UniqueConstraint, DECIMAL,
 )
 from sqlalchemy.types import TypeDecorator, CHAR
@@ -168,6 +168,8 @@ class Application(Base):
     __tablename__ = 'applications'
     __table_args__ = (
         UniqueConstraint('tenant_id', 'slug', name='uq_app_tenant_slug'),
+        # Serves list_by_tenant's ORDER BY created_at DESC without a sort step
+        Index('ix_app_tenant_created', 'tenant_id', 'created_at'),
     )
 
     id                = Column(GUID, primary_key=True, default=_uuid)
@@ -261,6 +263,14 @@ class Deployment(Base):
     This replaces the in-memory dict in deployment_orchestrator.py.
     """
     __tablename__ = 'deployments'
+    __table_args__ = (
+        # Covering index for list_by_application — INCLUDE columns let
+        # PostgreSQL 11+ answer the history query with an index-only scan.
+        # Other dialects ignore postgresql_include and get a plain index.
+        Index('ix_deployment_app_started', 'application_id', 'started_at',
+              postgresql_include=['status', 'short_id', 'deployment_url',
+                                  'duration_seconds']),
+    )
 
     id                    = Column(GUID, primary_key=True, default=_uuid)
     tenant_id             = Column(GUID, ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False)
@@ -353,6 +363,10 @@ class DeploymentLog(Base):
       - Natural ordering by insertion order
     """
     __tablename__ = 'deployment_logs'
+    __table_args__ = (
+        # Keyset pagination: WHERE deployment_id = ? AND id > ? ORDER BY id
+        Index('ix_deployment_log_dep_id', 'deployment_id', 'id'),
+    )
 
     # SQLite note: BigInteger maps to BIGINT which SQLite won't auto-increment.
     # Integer (below) maps to INTEGER — SQLite's native 64-bit auto-increment type.
@@ -361,7 +375,8 @@ class DeploymentLog(Base):
     deployment_id = Column(GUID, ForeignKey('deployments.id', ondelete='CASCADE'), nullable=False)
     timestamp     = Column(DateTime, default=datetime.utcnow)
     log_level     = Column(String(20), default='INFO')   # DEBUG | INFO | WARNING | ERROR
-    message       = Column(Text, nullable=False)
+    message       = Column(Text, nullable=False)           # capped at 4KB by add_log
+    blob_url      = Column(Text)                            # full payload in S3 (build output)
 
     # relationships
     deployment = relationship('Deployment', back_populates='logs')
@@ -375,6 +390,7 @@ class DeploymentLog(Base):
             'timestamp': self.timestamp.isoformat() if self.timestamp else None,
             'log_level': self.log_level,
             'message': self.message,
+            'blob_url': self.blob_url,
         }
 
 
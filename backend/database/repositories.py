@@ -10,6 +10,10 @@ Pattern:
   repo.add_step(dep.id, 1, 'EC2 Created', 'success')
   repo.mark_success(dep.id, 'http://1.2.3.4')
 
+List queries are built with lambda_stmt: closure variables (app_id, limit …)
+become bound parameters, so one cached compiled statement serves every call
+instead of a new cache entry per argument combination.
+
 WHY a repository layer?
   - Single responsibility: DB logic in one place, not scattered across routes/orchestrator
   - Testable: swap real DB for a mock without touching orchestrator logic
@@ -17,12 +21,21 @@ WHY a repository layer?
 """
 
 import re
+import time
+import uuid
+import hashlib
 import logging
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 
-from sqlalchemy.orm import Session
+import boto3
+from sqlalchemy import insert, lambda_stmt, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, joinedload, selectinload
 
+from ..config import config
 from .models import (
     Application, ApplicationInstance, EC2Instance,
     Deployment, DeploymentStep, DeploymentLog,
@@ -31,6 +44,10 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Longest message stored in a deployment_logs row. Larger payloads (docker
+# build output) go to S3 via DeploymentRepository.add_log_blob().
+MAX_LOG_MESSAGE_CHARS = 4096
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # TenantRepository
@@ -118,10 +135,10 @@ class ApplicationRepository:
         })
 
     def list_by_tenant(self, tenant_id: str) -> List[Application]:
-        return (self.db.query(Application)
-                .filter_by(tenant_id=tenant_id)
-                .order_by(Application.created_at.desc())
-                .all())
+        stmt = lambda_stmt(lambda: select(Application))
+        stmt += lambda s: s.where(Application.tenant_id == tenant_id)
+        stmt += lambda s: s.order_by(Application.created_at.desc())
+        return self.db.execute(stmt).scalars().all()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -147,6 +164,51 @@ class EC2InstanceRepository:
         logger.debug('EC2InstanceRepository.create: %s', aws_instance_id)
         return instance
 
+    def create_many(self, instance_specs: List[Dict],
+                    app_id: str = None) -> List[EC2Instance]:
+        """
+        Record several newly-created EC2 instances (scale-out) in 1-2 statements.
+
+        Each spec takes the same fields as create() — aws_instance_id,
+        public_ip, instance_type, region, extra columns — plus an optional
+        host_port. When app_id is given, every instance with a host_port is
+        linked to the app with one multi-row INSERT into application_instances.
+
+        Example:
+            ec2_repo.create_many([
+                {'aws_instance_id': 'i-1', 'public_ip': '1.2.3.4',
+                 'instance_type': 't3.micro', 'region': 'us-east-1', 'host_port': 8000},
+            ], app_id=app.id)
+        """
+        specs = [dict(spec) for spec in instance_specs]
+        host_ports = [spec.pop('host_port', None) for spec in specs]
+        instances = []
+        for spec in specs:
+            spec.setdefault('status', 'running')
+            instances.append(EC2Instance(instance_id=spec.pop('aws_instance_id'), **spec))
+
+        # return_defaults=True populates each object's id for the mapping rows
+        self.db.bulk_save_objects(instances, return_defaults=True)
+
+        if app_id:
+            mappings = [
+                {
+                    'application_id': app_id,
+                    'instance_id': instance.id,
+                    'host_port': host_port,
+                    'status': 'active',
+                }
+                for instance, host_port in zip(instances, host_ports)
+                if host_port is not None
+            ]
+            if mappings:
+                self.db.execute(insert(ApplicationInstance).values(mappings)
+                                .returning(ApplicationInstance.id))
+
+        logger.debug('EC2InstanceRepository.create_many: %s',
+                     ', '.join(i.instance_id for i in instances))
+        return instances
+
     def get_by_aws_id(self, aws_instance_id: str) -> Optional[EC2Instance]:
         return self.db.query(EC2Instance).filter_by(instance_id=aws_instance_id).first()
 
@@ -179,51 +241,139 @@ class EC2InstanceRepository:
 class DeploymentRepository:
     def __init__(self, db: Session):
         self.db = db
+        # Steps and log lines recorded by add_step() / add_log(), written with
+        # one multi-row INSERT per table by flush_pending()
+        self._pending_steps: List[Dict] = []
+        self._pending_logs: List[Dict] = []
 
     # ── Create ────────────────────────────────────────────────────────────
     def create(self, tenant_id: str, application_id: str, **kwargs) -> Deployment:
         """
         Start a new deployment record.
         The caller must commit() after the first real step completes.
+
+        id and short_id are assigned here rather than by the column defaults,
+        so both are usable immediately without a flush round-trip.
         """
+        short_id = hashlib.blake2b(
+            f'{tenant_id}{application_id}{time.monotonic_ns()}'.encode(),
+            digest_size=4,
+        ).hexdigest()
         dep = Deployment(
+            id=str(uuid.uuid4()),
+            short_id=short_id,
             tenant_id=tenant_id,
             application_id=application_id,
             status='in_progress',
             **kwargs,
         )
         self.db.add(dep)
-        self.db.flush()   # get dep.id + dep.short_id before committing
         logger.info('Deployment started: short_id=%s', dep.short_id)
         return dep
 
-    # ── Read ──────────────────────────────────────────────────────────────
-    def get_by_id(self, dep_id: str) -> Optional[Deployment]:
-        return self.db.query(Deployment).filter_by(id=dep_id).first()
+    # ── Transaction scope ─────────────────────────────────────────────────
+    @contextmanager
+    def deployment_session(self):
+        """
+        Run the body of a deployment as ONE transaction.
+
+        Steps, log lines and status updates accumulate in the session and are
+        sent with a single flush + commit when the block exits normally,
+        instead of a commit (and WAL fsync) after every step. checkpoint()
+        commits early at the few points worth making durable (and hands the
+        pooled connection back before a long wait).
+
+        If the block raises, whatever was recorded so far (EC2 row, log
+        lines, steps) is still committed so the failed deployment keeps its
+        history — unless the session itself is broken, in which case it is
+        rolled back. The exception is always re-raised.
+
+            with dep_repo.deployment_session():
+                dep_repo.add_step(dep.id, 1, 'EC2 Instance Created')
+                ...
+                dep_repo.mark_success(dep.id, url)
+        """
+        autoflush = self.db.autoflush
+        self.db.autoflush = False
+        try:
+            yield self
+        except Exception:
+            try:
+                self.flush_pending()
+                self.db.commit()
+            except SQLAlchemyError as db_err:
+                logger.error('deployment_session: could not save partial progress: %s', db_err)
+                self.db.rollback()
+            raise
+        else:
+            self.flush_pending()
+            self.db.flush()
+            self.db.commit()
+        finally:
+            self.db.autoflush = autoflush
 
-    def get_by_short_id(self, short_id: str) -> Optional[Deployment]:
-        return self.db.query(Deployment).filter_by(short_id=short_id).first()
+    def checkpoint(self):
+        """
+        Commit what has been recorded so far, inside deployment_session().
+
+        Once SQL has been sent, the transaction keeps a pooled connection
+        checked out until it commits; call this after writing durable state
+        (EC2 row, container started) and before the next multi-minute SSH or
+        HTTP wait, so concurrent deployments do not exhaust the pool.
+        """
+        self.flush_pending()
+        self.db.commit()
+
+    # ── Read ──────────────────────────────────────────────────────────────
+    def _query(self, with_details: bool):
+        q = self.db.query(Deployment)
+        if with_details:
+            # Application in the same SELECT, steps in one more (not one per access)
+            q = q.options(joinedload(Deployment.application),
+                          selectinload(Deployment.steps))
+        return q
+
+    def get_by_id(self, dep_id: str, with_details: bool = False) -> Optional[Deployment]:
+        """with_details=True eager-loads .application and .steps."""
+        return self._query(with_details).filter_by(id=dep_id).first()
+
+    def get_by_short_id(self, short_id: str, with_details: bool = False) -> Optional[Deployment]:
+        """with_details=True eager-loads .application and .steps."""
+        return self._query(with_details).filter_by(short_id=short_id).first()
 
     def list_all(self, limit: int = 50) -> List[Deployment]:
-        return (self.db.query(Deployment)
-                .order_by(Deployment.started_at.desc())
-                .limit(limit).all())
+        """Newest first, with .application loaded in the same query."""
+        stmt = lambda_stmt(lambda: select(Deployment).options(joinedload(Deployment.application)))
+        stmt += lambda s: s.order_by(Deployment.started_at.desc()).limit(limit)
+        return self.db.execute(stmt).scalars().all()
 
-    def list_by_application(self, app_id: str, limit: int = 20) -> List[Deployment]:
-        return (self.db.query(Deployment)
-                .filter_by(application_id=app_id)
-                .order_by(Deployment.started_at.desc())
-                .limit(limit).all())
+    def list_by_application(self, app_id: str, limit: int = 20) -> List[Row]:
+        """
+        Recent deployment history for one app, newest first.
+        Returns lightweight Row tuples (not ORM objects) — only the columns the
+        UI displays, all of which live in ix_deployment_app_started.
+        """
+        stmt = lambda_stmt(lambda: select(
+            Deployment.id, Deployment.short_id, Deployment.status,
+            Deployment.started_at, Deployment.duration_seconds,
+            Deployment.deployment_url))
+        stmt += lambda s: s.where(Deployment.application_id == app_id)
+        stmt += lambda s: s.order_by(Deployment.started_at.desc()).limit(limit)
+        return self.db.execute(stmt).all()
 
     # ── Status updates ────────────────────────────────────────────────────
+    def _get_started_at(self, dep_id: str) -> Optional[datetime]:
+        """Fetch only started_at — the status updaters need nothing else."""
+        return self.db.execute(
+            select(Deployment.started_at).where(Deployment.id == dep_id)
+        ).scalar_one_or_none()
+
     def mark_success(self, dep_id: str, deployment_url: str = None):
         """Mark deployment complete. Caller must commit()."""
+        self.flush_pending()
         now = datetime.utcnow()
-        dep = self.get_by_id(dep_id)
-        if dep and dep.started_at:
-            duration = int((now - dep.started_at).total_seconds())
-        else:
-            duration = None
+        started_at = self._get_started_at(dep_id)
+        duration = int((now - started_at).total_seconds()) if started_at else None
         self.db.query(Deployment).filter_by(id=dep_id).update({
             'status': 'success',
             'completed_at': now,
@@ -234,12 +384,10 @@ class DeploymentRepository:
 
     def mark_failed(self, dep_id: str, error_message: str):
         """Mark deployment failed. Caller must commit()."""
+        self.flush_pending()
         now = datetime.utcnow()
-        dep = self.get_by_id(dep_id)
-        if dep and dep.started_at:
-            duration = int((now - dep.started_at).total_seconds())
-        else:
-            duration = None
+        started_at = self._get_started_at(dep_id)
+        duration = int((now - started_at).total_seconds()) if started_at else None
         self.db.query(Deployment).filter_by(id=dep_id).update({
             'status': 'failed',
             'completed_at': now,
@@ -250,40 +398,108 @@ class DeploymentRepository:
 
     # ── Steps ─────────────────────────────────────────────────────────────
     def add_step(self, deployment_id: str, step_number: int, step_name: str,
-                 status: str = 'success', message: str = None) -> DeploymentStep:
+                 status: str = 'success', message: str = None) -> Dict:
         """
         Record a completed deployment step.
         Example: repo.add_step(dep.id, 1, 'EC2 Created', 'success')
+
+        No SQL is issued here — the step is buffered in memory and written
+        together with the others by flush_pending() (called from checkpoint /
+        mark_success / mark_failed), so a deployment costs one INSERT instead
+        of ~10.
         """
         now = datetime.utcnow()
-        step = DeploymentStep(
-            deployment_id=deployment_id,
-            step_number=step_number,
-            step_name=step_name,
-            status=status,
-            message=message,
-            started_at=now,
-            completed_at=now,
-        )
-        self.db.add(step)
-        self.db.flush()
+        step = {
+            'deployment_id': deployment_id,
+            'step_number':   step_number,
+            'step_name':     step_name,
+            'status':        status,
+            'message':       message,
+            'started_at':    now,
+            'completed_at':  now,
+        }
+        self._pending_steps.append(step)
         return step
 
+    def flush_pending(self):
+        """
+        Write all buffered steps and log lines, one multi-row INSERT per
+        table. Caller must commit().
+        """
+        if self._pending_steps:
+            self.db.execute(insert(DeploymentStep).values(self._pending_steps))
+        if self._pending_logs:
+            # List order = id order, which log tailing (get_logs) relies on
+            self.db.execute(insert(DeploymentLog).values(self._pending_logs))
+        logger.debug('DeploymentRepository.flush_pending: %d steps, %d logs',
+                     len(self._pending_steps), len(self._pending_logs))
+        self._pending_steps = []
+        self._pending_logs = []
+
     # ── Logs ──────────────────────────────────────────────────────────────
     def add_log(self, deployment_id: str, message: str,
-                level: str = 'INFO') -> DeploymentLog:
-        """Append a log line to a deployment."""
-        log = DeploymentLog(
-            deployment_id=deployment_id,
-            message=message,
-            log_level=level,
+                level: str = 'INFO') -> Dict:
+        """
+        Append a log line to a deployment. Buffered like add_step() and
+        written by the next flush_pending().
+        Messages longer than MAX_LOG_MESSAGE_CHARS are truncated.
+        """
+        log = {
+            'deployment_id': deployment_id,
+            'timestamp':     datetime.utcnow(),
+            'log_level':     level,
+            'message':       message[:MAX_LOG_MESSAGE_CHARS],
+            'blob_url':      None,
+        }
+        self._pending_logs.append(log)
+        return log
+
+    def add_log_blob(self, deployment_id: str, blob_bytes: bytes,
+                     level: str = 'INFO') -> Optional[Dict]:
+        """
+        Store a large payload (full build output) in S3 and log only its URL.
+
+        Object key: deployments/{deployment_id}/build.log in
+        config.DEPLOYMENT_LOG_BUCKET. Returns None (nothing stored) when no
+        bucket is configured or the upload fails.
+        """
+        if not config.DEPLOYMENT_LOG_BUCKET:
+            return None
+
+        key = f'deployments/{deployment_id}/build.log'
+        try:
+            s3 = boto3.client(
+                's3',
+                aws_access_key_id=config.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
+                region_name=config.AWS_REGION,
+            )
+            s3.put_object(Bucket=config.DEPLOYMENT_LOG_BUCKET, Key=key,
+                          Body=blob_bytes, ContentType='text/plain')
+        except Exception as e:
+            logger.error('add_log_blob: upload to s3://%s/%s failed: %s',
+                         config.DEPLOYMENT_LOG_BUCKET, key, e)
+            return None
+
+        blob_url = f's3://{config.DEPLOYMENT_LOG_BUCKET}/{key}'
+        log = self.add_log(
+            deployment_id,
+            f'Full build output ({len(blob_bytes)} bytes) stored at {blob_url}',
+            level=level,
         )
-        self.db.add(log)
-        self.db.flush()
+        log['blob_url'] = blob_url
         return log
 
-    def get_logs(self, deployment_id: str, limit: int = 500) -> List[DeploymentLog]:
+    def get_logs(self, deployment_id: str, after_id: int = 0,
+                 limit: int = 500) -> List[DeploymentLog]:
+        """
+        Log lines for a deployment in insertion order, starting after after_id.
+        Tail new output by passing back the last row's id:
+            logs = repo.get_logs(dep_id, after_id=logs[-1].id)
+        Served by an index range scan on (deployment_id, id).
+        """
         return (self.db.query(DeploymentLog)
-                .filter_by(deployment_id=deployment_id)
+                .filter(DeploymentLog.deployment_id == deployment_id,
+                        DeploymentLog.id > after_id)
                 .order_by(DeploymentLog.id.asc())
                 .limit(limit).all())
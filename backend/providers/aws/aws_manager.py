@@ -13,6 +13,21 @@ from ...config import config
 
 logger = logging.getLogger(__name__)
 
+# instance_running waiter: poll every 3s instead of boto's 15s default, so
+# create_instance returns within seconds of the instance coming up. Same
+# 10 minute ceiling as the default (15s x 40).
+_RUNNING_WAITER_CONFIG = {'Delay': 3, 'MaxAttempts': 200}
+
+
+# Security group name -> id. Every deploy uses the same group, so after the
+# first lookup create_instance skips describe_security_groups entirely.
+_sg_ids: Dict[str, str] = {}
+
+
+def clear_caches():
+    """Forget cached AWS metadata (call after the security group is changed)."""
+    _sg_ids.clear()
+
 
 class AWSManager:
     """Manages AWS EC2 instances and related resources."""
@@ -131,7 +146,12 @@ class AWSManager:
             key_name = config.AWS_KEY_PAIR_NAME
         
         if security_group_id is None:
-            security_group_id = self.create_or_get_security_group()
+            group_name = config.SECURITY_GROUP_NAME
+            security_group_id = _sg_ids.get(group_name)
+            if security_group_id is None:
+                # Resolved through this manager's client; only the id is cached
+                security_group_id = self.create_or_get_security_group(group_name)
+                _sg_ids[group_name] = security_group_id
         
         try:
             logger.info(f"Creating EC2 instance: {instance_name}")
@@ -179,7 +199,7 @@ class AWSManager:
             logger.info("Waiting for instance to be running...")
             
             # Wait for instance to be running
-            instance.wait_until_running()
+            instance.wait_until_running(WaiterConfig=_RUNNING_WAITER_CONFIG)
             instance.reload()
             
             public_ip = instance.public_ip_address
@@ -197,6 +217,9 @@ class AWSManager:
             }
             
         except ClientError as e:
+            if e.response['Error']['Code'] == 'InvalidGroup.NotFound':
+                # Cached group was deleted — re-resolve on the next deploy
+                clear_caches()
             logger.error(f"Error creating EC2 instance: {str(e)}")
             raise
     
@@ -314,18 +337,23 @@ class AWSManager:
                     }
                 ]
             
-            instances = self.ec2_resource.instances.filter(Filters=filters)
+            # Plain client pages: no per-instance resource objects or lazy loads
+            paginator = self.ec2_client.get_paginator('describe_instances')
+            pages = paginator.paginate(Filters=filters, PaginationConfig={'PageSize': 100})
             
             instance_list = []
-            for instance in instances:
-                instance_list.append({
-                    'instance_id': instance.id,
-                    'state': instance.state['Name'],
-                    'public_ip': instance.public_ip_address,
-                    'private_ip': instance.private_ip_address,
-                    'instance_type': instance.instance_type,
-                    'launch_time': instance.launch_time.isoformat() if instance.launch_time else None
-                })
+            for page in pages:
+                for reservation in page.get('Reservations', []):
+                    for instance in reservation.get('Instances', []):
+                        launch_time = instance.get('LaunchTime')
+                        instance_list.append({
+                            'instance_id': instance['InstanceId'],
+                            'state': instance['State']['Name'],
+                            'public_ip': instance.get('PublicIpAddress'),
+                            'private_ip': instance.get('PrivateIpAddress'),
+                            'instance_type': instance.get('InstanceType'),
+                            'launch_time': launch_time.isoformat() if launch_time else None
+                        })
             
             return instance_list
             
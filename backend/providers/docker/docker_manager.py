@@ -1,16 +1,51 @@
 """
 Docker Manager for the Automated Deployment Framework.
 Handles Docker installation, image building, and container management on remote EC2 instances.
+
+Pre-baked AMI
+-------------
+A cold deploy spends most of its time in install_docker (cloud-init wait +
+apt). Launching from an AMI that already has Docker and git skips all of
+it: install_docker / install_git see the marker file and return at once.
+Build one with Packer and point EC2_AMI_ID at the result:
+
+    source "amazon-ebs" "deploy" {
+      source_ami    = "<Ubuntu 22.04 AMI for your region>"
+      instance_type = "t3.small"
+      ssh_username  = "ubuntu"
+      ami_name      = "deploy-framework-{{timestamp}}"
+    }
+    build {
+      sources = ["source.amazon-ebs.deploy"]
+      provisioner "shell" {
+        inline = [
+          "cloud-init status --wait",
+          "curl -fsSL https://get.docker.com | sudo sh",
+          "sudo apt-get install -y git",
+          "sudo usermod -aG docker ubuntu",
+          "sudo systemctl enable docker",
+          "echo deploy-framework-$(date +%Y%m%d) | sudo tee /etc/deploy-framework-ami",
+        ]
+      }
+    }
 """
 
+import base64
 import logging
+import shlex
 import time
-from typing import Dict, Optional, List, Tuple
-from ...core.utils import SSHClient
+from typing import Callable, Dict, Iterator, Optional, List, Tuple
+from ...core.utils import RemoteCommandError, SSHConnectionPool, run_on_hosts
 
 logger = logging.getLogger(__name__)
 
 
+def _is_registry_ref(image_name: str) -> bool:
+    """True if image_name names a registry (registry.example.com/app, localhost:5000/app)."""
+    first, sep, _ = image_name.partition('/')
+    return bool(sep) and ('.' in first or ':' in first or first == 'localhost')
+
+
 class DockerManager:
     """Manages Docker operations on remote EC2 instances."""
     
@@ -23,8 +58,13 @@ class DockerManager:
             username: SSH username
             key_file: Path to private key file
         """
-        self.ssh = SSHClient(hostname, username, key_file)
+        # Shared with the other managers connected to the same host
+        self.ssh = SSHConnectionPool.get(hostname, username, key_file)
         self.hostname = hostname
+        # Set after the first successful install/check so later calls skip SSH
+        self._docker_installed = False
+        # Whether `docker buildx` works here (None = not probed yet)
+        self._buildx_available = None
         
     def connect(self, max_wait: int = 180, retry_interval: int = 5,
                 progress_callback: Optional[callable] = None) -> None:
@@ -42,19 +82,43 @@ class DockerManager:
         """
         self.ssh.connect(max_wait, retry_interval, progress_callback)
     
-    def install_docker(self) -> Tuple[bool, str]:
+    def install_docker(self, progress_callback: Optional[callable] = None) -> Tuple[bool, str]:
         """
         Install Docker Engine on the remote instance.
         
+        Args:
+            progress_callback: Optional callback for progress updates while
+                               waiting for cloud-init
+        
         Returns:
             Tuple of (success, message)
         """
+        if self._docker_installed:
+            return True, "Docker already installed (cached)"
+        
         try:
             logger.info("Installing Docker on remote instance...")
             
+            # Pre-baked AMI: Docker is part of the image
+            marker = self.ssh.check_prebaked()
+            if marker:
+                logger.info(f"Pre-baked AMI detected ({marker}), skipping Docker install")
+                self._docker_installed = True
+                return True, f"Docker pre-installed on AMI: {marker}"
+            
+            # Check if Docker is already installed (re-deploy onto an existing host)
+            exit_code, stdout, stderr = self.ssh.execute_command("sudo docker --version")
+            
+            if exit_code == 0:
+                version = stdout.strip()
+                logger.info(f"Docker already installed: {version}")
+                self._docker_installed = True
+                return True, f"Docker already installed: {version}"
+            
             logger.info("Waiting for cloud-init and boot processes to finish...")
-            # cloud-init blocks until all automated boot scripts (like unattended-upgrades) finish
-            self.ssh.execute_command("cloud-init status --wait || true", timeout=600)
+            # cloud-init runs automated boot scripts (like unattended-upgrades)
+            # that hold the apt lock
+            self._wait_for_cloud_init(progress_callback=progress_callback)
             
             logger.info("System boot complete. Ready for Docker installation.")
             
@@ -63,11 +127,10 @@ class DockerManager:
             
             # Docker installation commands for Ubuntu
             install_commands = [
-                # Update package index
-                f"{APT} update",
-                
-                # Install prerequisites
-                f"{APT} install -y ca-certificates curl gnupg lsb-release",
+                # Install prerequisites — already present on Ubuntu server AMIs,
+                # so the extra index update only runs when something is missing
+                f"dpkg -s ca-certificates curl gnupg lsb-release >/dev/null 2>&1 || "
+                f"{{ {APT} update && {APT} install -y --no-install-recommends ca-certificates curl gnupg lsb-release; }}",
                 
                 # Add Docker's official GPG key
                 "sudo mkdir -p /etc/apt/keyrings",
@@ -76,45 +139,98 @@ class DockerManager:
                 # Set up Docker repository
                 'echo "deb [arch=$(dpkg --print-architecture) signed-by=/etc/apt/keyrings/docker.gpg] https://download.docker.com/linux/ubuntu $(lsb_release -cs) stable" | sudo tee /etc/apt/sources.list.d/docker.list > /dev/null',
                 
-                # Update package index again
+                # Update package index (picks up the Docker repository)
                 f"{APT} update",
                 
                 # Install Docker Engine
-                f"{APT} install -y docker-ce docker-ce-cli containerd.io docker-buildx-plugin docker-compose-plugin",
+                f"{APT} install -y --no-install-recommends docker-ce docker-ce-cli containerd.io docker-buildx-plugin docker-compose-plugin",
                 
                 # Add user to docker group
                 f"sudo usermod -aG docker {self.ssh.username}",
                 
-                # Start Docker service
-                "sudo systemctl start docker",
+                # Start Docker service (no-op if the package install already started it)
+                "systemctl is-active --quiet docker || sudo systemctl start docker",
                 "sudo systemctl enable docker",
                 
                 # Verify installation
                 "sudo docker --version"
             ]
             
-            results = self.ssh.execute_commands(install_commands, stop_on_error=True)
+            # One SSH exec for the whole install instead of one per command
+            exit_code, stdout, stderr = self.ssh.execute_script(install_commands, timeout=900)
             
-            # Check if all commands succeeded
-            if all(result[0] == 0 for result in results):
+            if exit_code == 0:
                 logger.info("Docker installed successfully")
                 
-                # Get Docker version
-                version_output = results[-1][1].strip()
+                # Get Docker version (last line printed by the script)
+                version_output = stdout.strip().splitlines()[-1] if stdout.strip() else ''
+                self._docker_installed = True
                 return True, f"Docker installed successfully: {version_output}"
             else:
-                # Find first failed command
-                for i, result in enumerate(results):
-                    if result[0] != 0:
-                        error_msg = f"Failed at command {i+1}: {install_commands[i]}\nError: {result[2]}"
-                        logger.error(error_msg)
-                        return False, error_msg
-                        
+                error_msg = f"Docker installation script failed (exit {exit_code})\nError: {stderr[-2000:]}"
+                logger.error(error_msg)
+                return False, error_msg
+                
         except Exception as e:
             error_msg = f"Error installing Docker: {str(e)}"
             logger.error(error_msg)
             return False, error_msg
     
+    def _wait_for_cloud_init(self, max_wait: int = 600,
+                             progress_callback: Optional[callable] = None) -> str:
+        """
+        Poll cloud-init until it has finished, with backoff.
+        
+        Each poll is a short `cloud-init status` exec, so progress updates keep
+        flowing and an instance where cloud-init already finished costs a
+        single call — unlike one `cloud-init status --wait` blocking the
+        channel for up to max_wait seconds.
+        
+        Args:
+            max_wait: Give up waiting after this many seconds (default: 600s)
+            progress_callback: Optional callback for progress updates
+            
+        Returns:
+            Last status reported by cloud-init (e.g. "done"), or "timeout"
+        """
+        import json
+        import re
+        
+        start_time = time.time()
+        delay = 1
+        status = 'unknown'
+        
+        while time.time() - start_time < max_wait:
+            exit_code, stdout, stderr = self.ssh.execute_command(
+                "cloud-init status --format=json 2>/dev/null || cloud-init status", timeout=30)
+            
+            try:
+                status = json.loads(stdout).get('status', 'unknown')
+            except ValueError:
+                match = re.search(r'status:\s*([\w ]+)', stdout)
+                status = match.group(1).strip() if match else 'unknown'
+            
+            # "error" is treated like done — the old `--wait || true` did the same.
+            # No cloud-init on the image at all (exit 127) means nothing to wait for.
+            if status in ('done', 'disabled', 'error') or exit_code == 127:
+                logger.info(f"cloud-init finished: {status}")
+                return status
+            
+            elapsed = int(time.time() - start_time)
+            if progress_callback:
+                progress_callback(
+                    step='Docker Installation',
+                    message=f'[WAIT] cloud-init {status} ({elapsed}s elapsed)...',
+                    status='in_progress',
+                    data={}
+                )
+            
+            time.sleep(delay)
+            delay = min(delay * 2, 4)
+        
+        logger.warning(f"cloud-init still '{status}' after {max_wait}s, continuing anyway")
+        return 'timeout'
+    
     def check_docker_installed(self) -> bool:
         """
         Check if Docker is already installed.
@@ -122,20 +238,48 @@ class DockerManager:
         Returns:
             True if Docker is installed
         """
+        if self._docker_installed:
+            return True
+        
         try:
             exit_code, stdout, stderr = self.ssh.execute_command("sudo docker --version")
-            return exit_code == 0
+            self._docker_installed = exit_code == 0
+            return self._docker_installed
         except:
             return False
     
-    def build_image(self, project_path: str, image_name: str, tag: str = 'latest') -> Tuple[bool, str]:
+    def _has_buildx(self) -> bool:
+        """
+        Check (once per manager) whether the buildx plugin is installed.
+        
+        Docker from Ubuntu's docker.io package, or a pre-baked AMI that was
+        not built with docker-ce, has no buildx.
+        """
+        if self._buildx_available is None:
+            exit_code, stdout, stderr = self.ssh.execute_command("sudo docker buildx version")
+            self._buildx_available = exit_code == 0
+            if not self._buildx_available:
+                logger.info("docker buildx not available, building with the legacy docker build")
+        return self._buildx_available
+    
+    def build_image(self, project_path: str, image_name: str, tag: str = 'latest',
+                    cache_from: List[str] = None) -> Tuple[bool, str]:
         """
         Build Docker image from Dockerfile.
         
+        Builds with BuildKit through docker buildx (the legacy `docker build`
+        where the buildx plugin is missing). When image_name is a registry
+        reference (registry.example.com/app), the previous {image_name}:{tag}
+        is pulled and passed as --cache-from together with the
+        {image_name}:buildcache registry ref, so unchanged layers are reused
+        on a fresh host instead of being rebuilt from scratch. A plain local name is never pulled:
+        Docker Hub would resolve it to an unrelated library/ image.
+        
         Args:
             project_path: Path to project directory containing Dockerfile
             image_name: Name for the Docker image
             tag: Image tag (default: latest)
+            cache_from: Additional images to use as layer cache sources
             
         Returns:
             Tuple of (success, message)
@@ -143,8 +287,34 @@ class DockerManager:
         try:
             logger.info(f"Building Docker image: {image_name}:{tag}")
             
-            # Build command
-            build_command = f"cd {project_path} && sudo docker build -t {image_name}:{tag} ."
+            cache_sources = list(cache_from or [])
+            pull_command = ""
+            if _is_registry_ref(image_name):
+                cache_sources[:0] = [
+                    f"{image_name}:{tag}",
+                    f"type=registry,ref={image_name}:buildcache",
+                ]
+                # A failed pull just means there is no cache yet
+                pull_command = f"{{ sudo docker pull {image_name}:{tag} >/dev/null 2>&1 || true; }} && "
+            
+            # BuildKit (via buildx on the default docker driver) resolves
+            # independent stages concurrently; --load keeps the result in the
+            # local daemon for run_container. Without buildx, Docker CLI 23+
+            # refuses DOCKER_BUILDKIT=1, so use the legacy builder: it builds
+            # into the daemon already and takes only image cache sources.
+            if self._has_buildx():
+                cache_args = "".join(f" --cache-from {src}" for src in cache_sources)
+                build_cmd = (f"sudo DOCKER_BUILDKIT=1 docker buildx build --load --progress=plain"
+                             f"{cache_args} --cache-to type=inline")
+            else:
+                cache_args = "".join(f" --cache-from {src}" for src in cache_sources
+                                     if not src.startswith('type='))
+                build_cmd = f"sudo docker build{cache_args}"
+            build_command = (
+                f"cd {project_path} && "
+                f"{pull_command}"
+                f"{build_cmd} -t {image_name}:{tag} ."
+            )
             
             exit_code, stdout, stderr = self.ssh.execute_command(build_command, timeout=600)
             
@@ -162,13 +332,133 @@ class DockerManager:
             logger.error(error_msg)
             return False, error_msg
     
+    def build_and_push(self, project_path: str, image_ref: str,
+                       platform: str = 'linux/amd64') -> Tuple[bool, str]:
+        """
+        Build an image once and push it to a registry for other hosts to pull.
+        
+        For fleet deploys: one host builds, every target only pulls
+        (run_container(..., pull=True)) instead of each running its own build.
+        The layer cache lives in the registry as {repo}:buildcache (mode=max),
+        so it survives across fresh builder instances. Exporting that cache
+        needs a docker-container buildx builder, created on first use.
+        The host must already be logged in to the registry (docker login or
+        a credential helper such as the ECR one).
+        
+        Args:
+            project_path: Path to project directory containing Dockerfile
+            image_ref: Full registry reference, e.g. registry.example.com/app:1a2b3c4d
+            platform: Target platform of the pushed image
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        try:
+            logger.info(f"Building and pushing {image_ref} ({platform})")
+            
+            cache_ref = f"{image_ref.rsplit(':', 1)[0]}:buildcache"
+            command = (
+                f"cd {project_path} && "
+                f"{{ sudo docker buildx inspect deploy-builder >/dev/null 2>&1 || "
+                f"sudo docker buildx create --name deploy-builder --driver docker-container >/dev/null; }} && "
+                f"sudo DOCKER_BUILDKIT=1 docker buildx build --builder deploy-builder "
+                f"--platform {platform} --push --progress=plain -t {image_ref} "
+                f"--cache-to type=registry,ref={cache_ref},mode=max "
+                f"--cache-from type=registry,ref={cache_ref} ."
+            )
+            
+            exit_code, stdout, stderr = self.ssh.execute_command(command, timeout=900)
+            
+            if exit_code == 0:
+                success_msg = f"Image built and pushed: {image_ref}"
+                logger.info(success_msg)
+                return True, success_msg
+            else:
+                error_msg = f"Failed to build/push image.\nStdout: {stdout}\nStderr: {stderr}"
+                logger.error(error_msg)
+                return False, error_msg
+                
+        except Exception as e:
+            error_msg = f"Error building/pushing image: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
+    
+    def _build_run_command(self,
+                           image_name: str,
+                           container_name: str,
+                           port_mapping: Dict[int, int],
+                           env_vars: Dict[str, str] = None,
+                           detached: bool = True,
+                           restart_policy: str = 'unless-stopped',
+                           pull: bool = False) -> str:
+        """
+        Build the `docker run` command line shared by run_container and redeploy.
+        
+        Environment variables are not put on the command line: they are
+        written (base64-encoded, so no shell quoting is involved) to a
+        private env file that is passed with --env-file and deleted once
+        `docker run` returns. Docker env files cannot hold newlines, so
+        multi-line values fall back to a shell-quoted `-e KEY=VALUE`.
+        
+        Returns:
+            The full shell command string
+        """
+        prefix = ""
+        env_file = None
+        env_args = ""
+        if env_vars:
+            env_lines = []
+            for key, value in env_vars.items():
+                value = str(value)
+                if '\n' in value or '\r' in value:
+                    env_args += f" -e {shlex.quote(f'{key}={value}')}"
+                else:
+                    env_lines.append(f"{key}={value}\n")
+            if env_lines:
+                env_file = shlex.quote(f"/tmp/env.{container_name}")
+                payload = base64.b64encode(''.join(env_lines).encode('utf-8')).decode('ascii')
+                prefix = f"(umask 077 && echo {payload} | base64 -d > {env_file}) && "
+        
+        run_command = f"sudo docker run"
+        
+        if detached:
+            run_command += " -d"
+        
+        # Refresh the image from its registry as part of the same command
+        if pull:
+            run_command += " --pull=always"
+        
+        # Add restart policy
+        run_command += f" --restart {restart_policy}"
+        
+        # Add container name
+        run_command += f" --name {shlex.quote(container_name)}"
+        
+        # Add port mappings
+        for host_port, container_port in port_mapping.items():
+            run_command += f" -p {host_port}:{container_port}"
+        
+        # Add environment variables
+        if env_file:
+            run_command += f" --env-file {env_file}"
+        run_command += env_args
+        
+        # Add image name
+        run_command += f" {shlex.quote(image_name)}"
+        
+        if env_file:
+            # Remove the env file but keep docker run's exit status
+            return f"{prefix}{run_command}; rc=$?; rm -f {env_file}; (exit $rc)"
+        return run_command
+    
     def run_container(self, 
                      image_name: str,
                      container_name: str,
                      port_mapping: Dict[int, int],
                      env_vars: Dict[str, str] = None,
                      detached: bool = True,
-                     restart_policy: str = 'unless-stopped') -> Tuple[bool, str]:
+                     restart_policy: str = 'unless-stopped',
+                     pull: bool = False) -> Tuple[bool, str]:
         """
         Run Docker container from image.
         
@@ -179,6 +469,8 @@ class DockerManager:
             env_vars: Environment variables for the container
             detached: Run container in detached mode
             restart_policy: Container restart policy
+            pull: Pull image_name from its registry first (images published
+                  by build_and_push); leave False for locally built images
             
         Returns:
             Tuple of (success, message)
@@ -186,29 +478,10 @@ class DockerManager:
         try:
             logger.info(f"Running Docker container: {container_name}")
             
-            # Build docker run command
-            run_command = f"sudo docker run"
-            
-            if detached:
-                run_command += " -d"
-            
-            # Add restart policy
-            run_command += f" --restart {restart_policy}"
-            
-            # Add container name
-            run_command += f" --name {container_name}"
-            
-            # Add port mappings
-            for host_port, container_port in port_mapping.items():
-                run_command += f" -p {host_port}:{container_port}"
-            
-            # Add environment variables
-            if env_vars:
-                for key, value in env_vars.items():
-                    run_command += f' -e {key}="{value}"'
-            
-            # Add image name
-            run_command += f" {image_name}"
+            run_command = self._build_run_command(
+                image_name, container_name, port_mapping, env_vars,
+                detached, restart_policy, pull,
+            )
             
             logger.info(f"Docker run command: {run_command}")
             
@@ -229,34 +502,89 @@ class DockerManager:
             logger.error(error_msg)
             return False, error_msg
     
-    def get_container_status(self, container_name: str) -> Dict:
+    def redeploy(self,
+                 image_name: str,
+                 container_name: str,
+                 port_mapping: Dict[int, int],
+                 env_vars: Dict[str, str] = None,
+                 restart_policy: str = 'unless-stopped',
+                 pull: bool = False) -> Tuple[bool, str]:
         """
-        Get status of a Docker container.
+        Replace a container with a fresh one from image_name in ONE SSH exec.
+        
+        Equivalent to stop_container + remove_container + run_container, but
+        the three steps run as a single remote command line, so there is no
+        network round trip between them.
         
         Args:
-            container_name: Container name
+            image_name: Docker image name with tag
+            container_name: Name of the container to replace
+            port_mapping: Dictionary of {host_port: container_port}
+            env_vars: Environment variables for the container
+            restart_policy: Container restart policy
+            pull: Pull the image from its registry as part of the run
+                  (leave False for images built locally on the host)
             
         Returns:
-            Dictionary with container status
+            Tuple of (success, message)
         """
         try:
-            command = f"sudo docker inspect {container_name}"
+            logger.info(f"Redeploying container: {container_name}")
+            
+            run_command = self._build_run_command(
+                image_name, container_name, port_mapping, env_vars,
+                restart_policy=restart_policy, pull=pull,
+            )
+            # `rm -f` stops the container first; a missing container is fine
+            command = f"sudo docker rm -f {shlex.quote(container_name)} >/dev/null 2>&1 || true; {run_command}"
+            
             exit_code, stdout, stderr = self.ssh.execute_command(command)
             
             if exit_code == 0:
-                import json
-                container_info = json.loads(stdout)[0]
-                
-                return {
-                    'name': container_info['Name'].lstrip('/'),
-                    'status': container_info['State']['Status'],
-                    'running': container_info['State']['Running'],
-                    'started_at': container_info['State']['StartedAt'],
-                    'image': container_info['Config']['Image']
-                }
+                # The container ID is the last line `docker run -d` prints
+                lines = stdout.strip().splitlines()
+                container_id = lines[-1] if lines else ''
+                success_msg = f"Container redeployed successfully: {container_id[:12]}"
+                logger.info(success_msg)
+                return True, success_msg
             else:
-                return {'status': 'not_found', 'running': False}
+                error_msg = f"Failed to redeploy container.\nStdout: {stdout}\nStderr: {stderr}"
+                logger.error(error_msg)
+                return False, error_msg
                 
+        except Exception as e:
+            error_msg = f"Error redeploying container: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
+    
+    def get_container_status(self, container_name: str) -> Dict:
+        """
+        Get status of a Docker container.
+        
+        Args:
+            container_name: Container name
+            
+        Returns:
+            Dictionary with container status
+        """
+        try:
+            # Project just the fields we need instead of the full inspect JSON
+            fmt = "{{.Name}}|{{.State.Status}}|{{.State.Running}}|{{.State.StartedAt}}|{{.Config.Image}}"
+            # stdout only: stderr (sudo/docker warnings) must not reach the parser
+            exit_code, stdout, stderr = self.ssh.execute_command(
+                f"sudo docker inspect --format '{fmt}' {container_name}")
+            if exit_code != 0:
+                return {'status': 'not_found', 'running': False}
+            name, status, running, started_at, image = stdout.strip().split('|', 4)
+            
+            return {
+                'name': name.lstrip('/'),
+                'status': status,
+                'running': running == 'true',
+                'started_at': started_at,
+                'image': image
+            }
+            
         except Exception as e:
             logger.error(f"Error getting container status: {str(e)}")
             return {'status': 'error', 'running': False, 'error': str(e)}
@@ -274,14 +602,11 @@ class DockerManager:
         try:
             logger.info(f"Stopping container: {container_name}")
             
-            command = f"sudo docker stop {container_name}"
-            exit_code, stdout, stderr = self.ssh.execute_command(command)
+            self.ssh.run_checked(f"sudo docker stop {container_name}")
+            return True, f"Container {container_name} stopped successfully"
             
-            if exit_code == 0:
-                return True, f"Container {container_name} stopped successfully"
-            else:
-                return False, f"Failed to stop container: {stderr}"
-                
+        except RemoteCommandError as e:
+            return False, f"Failed to stop container: {e}"
         except Exception as e:
             return False, f"Error stopping container: {str(e)}"
     
@@ -299,14 +624,11 @@ class DockerManager:
         try:
             logger.info(f"Removing container: {container_name}")
             
-            command = f"sudo docker rm {'-f ' if force else ''}{container_name}"
-            exit_code, stdout, stderr = self.ssh.execute_command(command)
+            self.ssh.run_checked(f"sudo docker rm {'-f ' if force else ''}{container_name}")
+            return True, f"Container {container_name} removed successfully"
             
-            if exit_code == 0:
-                return True, f"Container {container_name} removed successfully"
-            else:
-                return False, f"Failed to remove container: {stderr}"
-                
+        except RemoteCommandError as e:
+            return False, f"Failed to remove container: {e}"
         except Exception as e:
             return False, f"Error removing container: {str(e)}"
     
@@ -322,36 +644,72 @@ class DockerManager:
             Container logs
         """
         try:
-            command = f"sudo docker logs --tail {tail} {container_name}"
-            exit_code, stdout, stderr = self.ssh.execute_command(command)
-            
-            return stdout + stderr
+            return ''.join(self.stream_container_logs(container_name, tail))
             
         except Exception as e:
             logger.error(f"Error getting container logs: {str(e)}")
             return f"Error: {str(e)}"
     
-    def list_containers(self, all_containers: bool = False) -> List[Dict]:
+    def stream_container_logs(self, container_name: str, tail: int = 100,
+                              follow: bool = False) -> Iterator[str]:
+        """
+        Yield container log lines as they arrive over the SSH channel.
+        
+        Only one line is held in memory at a time, and the first lines can be
+        forwarded (e.g. to a web client) before the rest has been read.
+        
+        Args:
+            container_name: Container name
+            tail: Number of lines to retrieve
+            follow: Keep streaming new lines until the container stops
+                    (or the consumer stops iterating)
+            
+        Yields:
+            Log lines (stdout and stderr interleaved), newline included
+        """
+        command = f"sudo docker logs --tail {tail}{' --follow' if follow else ''} {container_name} 2>&1"
+        stdout_file, _ = self.ssh.execute_command(
+            command, timeout=None if follow else 300, stream=True)
+        
+        try:
+            while True:
+                line = stdout_file.readline()
+                if not line:
+                    break
+                yield line.decode('utf-8', 'replace') if isinstance(line, bytes) else line
+        finally:
+            stdout_file.channel.close()
+    
+    # Columns returned by list_containers() unless full=True
+    _PS_FIELDS = ('ID', 'Names', 'Image', 'Status', 'State')
+    
+    def list_containers(self, all_containers: bool = False, full: bool = False) -> List[Dict]:
         """
         List Docker containers.
         
         Args:
             all_containers: Include stopped containers
+            full: Return every field `docker ps` knows about (JSON per row)
+                  instead of the ID/Names/Image/Status/State projection
             
         Returns:
             List of container information
         """
         try:
-            command = f"sudo docker ps {'-a' if all_containers else ''} --format '{{{{json .}}}}'"
+            if full:
+                fmt = "{{json .}}"
+            else:
+                fmt = "\t".join(f"{{{{.{field}}}}}" for field in self._PS_FIELDS)
+            command = f"sudo docker ps {'-a' if all_containers else ''} --format '{fmt}'"
             exit_code, stdout, stderr = self.ssh.execute_command(command)
             
             if exit_code == 0:
-                import json
-                containers = []
-                for line in stdout.strip().split('\n'):
-                    if line:
-                        containers.append(json.loads(line))
-                return containers
+                lines = [line for line in stdout.strip().split('\n') if line]
+                if full:
+                    import json
+                    # One parse over the whole buffer instead of one per row
+                    return json.loads('[' + ','.join(lines) + ']')
+                return [dict(zip(self._PS_FIELDS, line.split('\t'))) for line in lines]
             else:
                 return []
                 
@@ -360,5 +718,87 @@ class DockerManager:
             return []
     
     def close(self):
-        """Close SSH connection."""
-        self.ssh.close()
+        """Release SSH connection (closed once no other manager uses it)."""
+        SSHConnectionPool.release(self.ssh)
+
+
+class DeployPool:
+    """
+    Runs DockerManager operations on several instances concurrently.
+    
+    Every step is SSH/network-bound, so a thread per host gives close to N×
+    speed-up over looping the hosts one after another. Each method returns
+    {hostname: (success, message)}; an exception on one host is reported as
+    that host's failure and does not affect the others.
+    
+        pool = DeployPool(['1.2.3.4', '5.6.7.8'], key_file='key.pem')
+        pool.connect()
+        pool.install_docker()
+        pool.build_image(repo_path, 'app')
+        pool.run_container('app:latest', 'app-container', {80: 8000})
+        pool.close()
+    
+    With a registry, build once and let every host pull instead:
+    
+        pool.build_once(repo_path, 'registry.example.com/app:1a2b3c4d')
+        pool.run_container('registry.example.com/app:1a2b3c4d', 'app-container',
+                           {80: 8000}, pull=True)
+    """
+    
+    def __init__(self, hostnames: List[str], username: str = 'ubuntu',
+                 key_file: Optional[str] = None, max_workers: Optional[int] = None):
+        """
+        Initialize the pool.
+        
+        Args:
+            hostnames: EC2 instance public IPs or DNS names
+            username: SSH username
+            key_file: Path to private key file
+            max_workers: Concurrent hosts (default: one thread per host)
+        """
+        self.managers = {host: DockerManager(host, username, key_file) for host in hostnames}
+        self.max_workers = max_workers or max(len(hostnames), 1)
+    
+    def _run_all(self, operation: Callable[[DockerManager], Tuple[bool, str]],
+                 name: str) -> Dict[str, Tuple[bool, str]]:
+        """Run operation(manager) for every host concurrently (see run_on_hosts)."""
+        return run_on_hosts(self.managers, operation, name, self.max_workers)
+    
+    def connect(self, max_wait: int = 180, retry_interval: int = 5) -> Dict[str, Tuple[bool, str]]:
+        """Establish SSH connections to all hosts concurrently."""
+        def _connect(manager: DockerManager) -> Tuple[bool, str]:
+            manager.connect(max_wait, retry_interval)
+            return True, "Connected"
+        return self._run_all(_connect, 'connect')
+    
+    def install_docker(self) -> Dict[str, Tuple[bool, str]]:
+        """Install Docker on all hosts concurrently."""
+        return self._run_all(lambda m: m.install_docker(), 'install_docker')
+    
+    def build_image(self, project_path: str, image_name: str,
+                    tag: str = 'latest') -> Dict[str, Tuple[bool, str]]:
+        """Build the image on all hosts concurrently."""
+        return self._run_all(lambda m: m.build_image(project_path, image_name, tag), 'build_image')
+    
+    def build_once(self, project_path: str, image_ref: str,
+                   builder: Optional[str] = None) -> Tuple[bool, str]:
+        """
+        Build and push image_ref on ONE host (default: the first) instead of all.
+        
+        Follow with run_container(image_ref, ..., pull=True) so every host
+        only pulls the published image.
+        """
+        host = builder or next(iter(self.managers))
+        return self.managers[host].build_and_push(project_path, image_ref)
+    
+    def run_container(self, image_name: str, container_name: str,
+                      port_mapping: Dict[int, int], **kwargs) -> Dict[str, Tuple[bool, str]]:
+        """Start the container on all hosts concurrently (kwargs as run_container)."""
+        return self._run_all(
+            lambda m: m.run_container(image_name, container_name, port_mapping, **kwargs),
+            'run_container')
+    
+    def close(self):
+        """Close all SSH connections."""
+        for manager in self.managers.values():
+            manager.close()
@@ -4,11 +4,44 @@ Handles GitHub repository operations and cloning to EC2 instances.
 """
 
 import logging
-from typing import Tuple, Optional
-from ...core.utils import SSHClient, parse_github_url, sanitize_name
+import os
+import shlex
+import subprocess
+import threading
+import time
+from typing import Dict, Tuple, Optional
+from ...config import config
+from ...core.utils import SSHConnectionPool, parse_github_url, sanitize_name
 
 logger = logging.getLogger(__name__)
 
+# verify_project_files results for a checked-out commit, shared by every
+# manager so back-to-back redeploys of the same repo skip the SSH probe.
+# Keyed by (owner, repo, branch, commit, files): a commit's tree never changes.
+_VERIFY_CACHE_TTL = 120
+_VERIFY_CACHE_MAX = 256
+_verify_cache: Dict[tuple, Tuple[float, Tuple[bool, list]]] = {}
+_verify_cache_lock = threading.Lock()
+
+
+def _verify_cache_get(key: tuple) -> Optional[Tuple[bool, list]]:
+    with _verify_cache_lock:
+        hit = _verify_cache.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() - hit[0] >= _VERIFY_CACHE_TTL:
+            del _verify_cache[key]
+            return None
+        return hit[1]
+
+
+def _verify_cache_put(key: tuple, result: Tuple[bool, list]):
+    with _verify_cache_lock:
+        if len(_verify_cache) >= _VERIFY_CACHE_MAX:
+            # Drop the oldest entry (dicts keep insertion order)
+            del _verify_cache[next(iter(_verify_cache))]
+        _verify_cache[key] = (time.monotonic(), result)
+
 
 class GitHubManager:
     """Manages GitHub repository operations."""
@@ -22,8 +55,19 @@ class GitHubManager:
             username: SSH username
             key_file: Path to private key file
         """
-        self.ssh = SSHClient(hostname, username, key_file)
+        # Shared with the other managers connected to the same host
+        self.ssh = SSHConnectionPool.get(hostname, username, key_file)
         self.hostname = hostname
+        # Set after the first successful install/check so later calls skip SSH
+        self._git_installed = False
+        # 'archive' = stream from the local cache (no git on the instance)
+        self.transport = 'archive' if config.GITHUB_CACHE_DIR else 'git'
+        # Filled in by clone_repository; answers branch/commit lookups locally
+        self.last_clone_path = None
+        self.last_branch = None
+        self.last_commit_hash = None
+        self.last_repo = None          # (owner, repo_name) of the last clone
+        self._archive_source = None
     
     def connect(self, max_wait: int = 180, retry_interval: int = 5,
                 progress_callback: Optional[callable] = None) -> None:
@@ -48,35 +92,47 @@ class GitHubManager:
         Returns:
             Tuple of (success, message)
         """
+        if self._git_installed:
+            return True, "Git already installed (cached)"
+        
         try:
             logger.info("Installing Git on remote instance...")
             
+            # Pre-baked AMI: git is part of the image
+            marker = self.ssh.check_prebaked()
+            if marker:
+                logger.info(f"Pre-baked AMI detected ({marker}), skipping Git install")
+                self._git_installed = True
+                return True, f"Git pre-installed on AMI: {marker}"
+            
             # Check if Git is already installed
             exit_code, stdout, stderr = self.ssh.execute_command("git --version")
             
             if exit_code == 0:
                 version = stdout.strip()
                 logger.info(f"Git already installed: {version}")
+                self._git_installed = True
                 return True, f"Git already installed: {version}"
             APT = "sudo apt-get -o Dpkg::Lock::Timeout=120 -o Dpkg::Options::='--force-confdef' -o Dpkg::Options::='--force-confold'"
             commands = [
                 # Install git if not present
                 f"{APT} update",
                 f"{APT} install -y git",
+                "git --version",
             ]
             
-            results = self.ssh.execute_commands(commands, stop_on_error=True)
+            exit_code, stdout, stderr = self.ssh.execute_script(commands, timeout=600)
             
-            if all(result[0] == 0 for result in results):
-                # Get Git version
-                exit_code, stdout, stderr = self.ssh.execute_command("git --version")
-                version = stdout.strip()
+            if exit_code == 0:
+                # Get Git version (last line printed by the script)
+                version = stdout.strip().splitlines()[-1] if stdout.strip() else ''
                 
                 success_msg = f"Git installed successfully: {version}"
                 logger.info(success_msg)
+                self._git_installed = True
                 return True, success_msg
             else:
-                error_msg = "Failed to install Git"
+                error_msg = f"Failed to install Git: {stderr[-2000:]}"
                 logger.error(error_msg)
                 return False, error_msg
                 
@@ -89,7 +145,8 @@ class GitHubManager:
                         repo_url: str,
                         destination: str = None,
                         branch: str = 'main',
-                        token: Optional[str] = None) -> Tuple[bool, str, str]:
+                        token: Optional[str] = None,
+                        transport: Optional[str] = None) -> Tuple[bool, str, str]:
         """
         Clone GitHub repository to the remote instance.
         
@@ -98,6 +155,10 @@ class GitHubManager:
             destination: Destination directory (default: repo name in home directory)
             branch: Branch to clone (default: main)
             token: GitHub token for private repositories
+            transport: 'archive' or 'git' (default: self.transport). An
+                       explicit 'archive' reports a failed archive instead of
+                       falling back to git on the instance, and so never runs
+                       apt (install_git)
             
         Returns:
             Tuple of (success, message, clone_path)
@@ -105,13 +166,9 @@ class GitHubManager:
         try:
             logger.info(f"Cloning repository: {repo_url}")
             
-            # Ensure Git is installed
-            git_installed, msg = self.install_git()
-            if not git_installed:
-                return False, f"Failed to install Git: {msg}", ""
-            
             # Parse repository URL
             owner, repo_name = parse_github_url(repo_url)
+            self.last_repo = (owner, repo_name)
             
             # Determine destination path
             if destination is None:
@@ -124,43 +181,172 @@ class GitHubManager:
                 if repo_url.startswith('https://github.com/'):
                     clone_url = repo_url.replace('https://github.com/', f'https://{token}@github.com/')
             
-            # Remove existing directory if it exists
-            self.ssh.execute_command(f"rm -rf {destination}")
-            
-            # Clone repository
-            clone_command = f"git clone -b {branch} {clone_url} {destination}"
+            # Stream the tree from the orchestrator's local cache when configured
+            if (transport or self.transport) == 'archive':
+                try:
+                    return self._clone_via_archive(clone_url, owner, repo_name, destination, branch)
+                except Exception as e:
+                    if transport == 'archive':
+                        error_msg = f"Cached clone failed: {e}"
+                        logger.warning(error_msg)
+                        return False, error_msg, ""
+                    logger.warning(f"Cached clone failed ({e}), falling back to git clone on the instance")
             
-            # If token is used, don't log the full command
-            if token:
-                logger.info(f"Cloning repository with authentication to {destination}")
-            else:
-                logger.info(f"Executing: {clone_command}")
-            
-            exit_code, stdout, stderr = self.ssh.execute_command(clone_command, timeout=300)
-            
-            if exit_code == 0:
-                # Get absolute path
-                exit_code, abs_path, _ = self.ssh.execute_command(f"readlink -f {destination}")
-                clone_path = abs_path.strip()
-                
-                success_msg = f"Repository cloned successfully to {clone_path}"
-                logger.info(success_msg)
-                return True, success_msg, clone_path
-            else:
-                # Try with master branch if main fails
-                if branch == 'main' and 'not found' in stderr.lower():
-                    logger.info("Branch 'main' not found, trying 'master'")
-                    return self.clone_repository(repo_url, destination, 'master', token)
-                
-                error_msg = f"Failed to clone repository.\nStdout: {stdout}\nStderr: {stderr}"
-                logger.error(error_msg)
-                return False, error_msg, ""
+            return self._clone_via_git(clone_url, destination, branch, authenticated=bool(token))
                 
         except Exception as e:
             error_msg = f"Error cloning repository: {str(e)}"
             logger.error(error_msg)
             return False, error_msg, ""
     
+    def _clone_via_git(self, clone_url: str, destination: str, branch: str,
+                       authenticated: bool = False) -> Tuple[bool, str, str]:
+        """
+        Shallow-clone the repository on the instance itself (installs git if needed).
+        
+        Args:
+            clone_url: Repository URL (with token for private repositories)
+            destination: Destination directory on the instance
+            branch: Branch to clone ('main' falls back to 'master')
+            authenticated: clone_url carries a token — don't log it
+            
+        Returns:
+            Tuple of (success, message, clone_path)
+        """
+        # Ensure Git is installed
+        git_installed, msg = self.install_git()
+        if not git_installed:
+            return False, f"Failed to install Git: {msg}", ""
+        
+        # Shallow clone — only the tip commit of one branch is needed to build
+        clone_command = (
+            f"git -c protocol.version=2 clone --depth 1 --single-branch --no-tags "
+            f"-b {branch} {clone_url} {destination}"
+        )
+        
+        # If token is used, don't log the full command
+        if authenticated:
+            logger.info(f"Cloning repository with authentication to {destination}")
+        else:
+            logger.info(f"Executing: {clone_command}")
+        
+        # Remove any old checkout, clone, resolve the absolute path and the
+        # commit — one SSH round trip; results[-1] is rev-parse or the failed step
+        results = self.ssh.run_batch([
+            f"rm -rf {destination}",
+            clone_command,
+            f"readlink -f {destination}",
+            f"git -C {destination} rev-parse HEAD",
+        ], timeout=300)
+        exit_code, stdout, stderr = results[-1]
+        
+        if exit_code == 0:
+            clone_path = results[2][1].strip()
+            self._remember_clone(clone_path, branch, stdout.strip())
+            
+            success_msg = f"Repository cloned successfully to {clone_path}"
+            logger.info(success_msg)
+            return True, success_msg, clone_path
+        else:
+            # Try with master branch if main fails
+            if branch == 'main' and 'not found' in stderr.lower():
+                logger.info("Branch 'main' not found, trying 'master'")
+                return self._clone_via_git(clone_url, destination, 'master', authenticated)
+            
+            error_msg = f"Failed to clone repository.\nStdout: {stdout}\nStderr: {stderr}"
+            logger.error(error_msg)
+            return False, error_msg, ""
+    
+    def _remember_clone(self, clone_path: str, branch: str, commit: str):
+        """Record what was checked out so later metadata lookups need no SSH call."""
+        self.last_clone_path = clone_path
+        self.last_branch = branch
+        self.last_commit_hash = commit
+        self._archive_source = None
+    
+    def _clone_via_archive(self, clone_url: str, owner: str, repo_name: str,
+                           destination: str, branch: str) -> Tuple[bool, str, str]:
+        """
+        Ship the branch tip to the instance as a tar stream from a local bare cache.
+        
+        The orchestrator keeps one bare repository per GitHub repo under
+        GITHUB_CACHE_DIR and only fetches new objects into it; the checked-out
+        tree (no .git) is piped over SSH into `tar -x`. The instance needs
+        neither git nor GitHub access, and the branch is resolved locally,
+        so the main → master fallback costs no extra clone.
+        
+        Args:
+            clone_url: Repository URL (with token for private repositories)
+            owner: Repository owner
+            repo_name: Repository name
+            destination: Destination directory on the instance
+            branch: Branch to deploy ('main' falls back to 'master')
+            
+        Returns:
+            Tuple of (success, message, clone_path)
+            
+        Raises:
+            RuntimeError: cache fetch or archive failed
+        """
+        cache_path = os.path.join(config.GITHUB_CACHE_DIR, f"{sanitize_name(owner)}-{sanitize_name(repo_name)}.git")
+        
+        if not os.path.isdir(cache_path):
+            subprocess.run(['git', 'init', '--bare', '--quiet', cache_path], check=True, timeout=60)
+        
+        # Fetch by URL so a token never ends up in the cache's git config
+        logger.info(f"Updating local repository cache {cache_path}")
+        fetch = subprocess.run(
+            ['git', '-C', cache_path, 'fetch', '--quiet', '--prune', '--no-tags', '--force',
+             clone_url, '+refs/heads/*:refs/heads/*'],
+            timeout=300, capture_output=True, text=True,
+        )
+        if fetch.returncode != 0:
+            # Don't let an authenticated URL leak into logs
+            raise RuntimeError(f"git fetch failed: {fetch.stderr.replace(clone_url, '<repository>').strip()}")
+        
+        candidates = [branch, 'master'] if branch == 'main' else [branch]
+        commit = None
+        for candidate in candidates:
+            rev = subprocess.run(
+                ['git', '-C', cache_path, 'rev-parse', '--verify', '--quiet', f'refs/heads/{candidate}^{{commit}}'],
+                capture_output=True, text=True, timeout=30,
+            )
+            if rev.returncode == 0:
+                commit, branch = rev.stdout.strip(), candidate
+                break
+        if commit is None:
+            return False, f"Branch '{branch}' not found in repository", ""
+        
+        logger.info(f"Streaming {branch}@{commit[:8]} to {destination}")
+        archive = subprocess.Popen(
+            ['git', '-C', cache_path, 'archive', '--format=tar', commit],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        try:
+            exit_code, stdout, stderr = self.ssh.execute_command_with_input(
+                f"rm -rf {destination} && mkdir -p {destination} && "
+                f"tar -x -C {destination} && readlink -f {destination}",
+                archive.stdout, timeout=300,
+            )
+        finally:
+            archive.stdout.close()
+            archive_rc = archive.wait()
+        
+        if archive_rc != 0:
+            raise RuntimeError(f"git archive failed: {archive.stderr.read().decode('utf-8', 'replace')}")
+        
+        if exit_code != 0:
+            error_msg = f"Failed to unpack repository.\nStdout: {stdout}\nStderr: {stderr}"
+            logger.error(error_msg)
+            return False, error_msg, ""
+        
+        clone_path = stdout.strip()
+        self._remember_clone(clone_path, branch, commit)
+        self._archive_source = (clone_url, owner, repo_name, destination, branch)
+        success_msg = f"Repository {branch}@{commit[:8]} copied to {clone_path}"
+        logger.info(success_msg)
+        return True, success_msg, clone_path
+    
     def pull_latest(self, repo_path: str) -> Tuple[bool, str]:
         """
         Pull latest changes from repository.
@@ -174,10 +360,21 @@ class GitHubManager:
         try:
             logger.info(f"Pulling latest changes for {repo_path}")
             
-            command = f"cd {repo_path} && git pull"
+            # No .git on archive checkouts — re-stream the branch tip instead
+            if self._archive_source and repo_path == self.last_clone_path:
+                success, msg, _ = self._clone_via_archive(*self._archive_source)
+                return success, msg
+            
+            # `git pull` does not work on a shallow clone; fetch the new tip
+            # of the checked-out branch and move to it instead
+            command = (
+                f"cd {repo_path} && branch=$(git rev-parse --abbrev-ref HEAD) && "
+                f"git fetch --depth 1 origin \"$branch\" && git reset --hard FETCH_HEAD"
+            )
             exit_code, stdout, stderr = self.ssh.execute_command(command)
             
             if exit_code == 0:
+                self.last_commit_hash = None   # HEAD moved
                 success_msg = f"Successfully pulled latest changes"
                 logger.info(success_msg)
                 return True, success_msg
@@ -191,28 +388,50 @@ class GitHubManager:
             logger.error(error_msg)
             return False, error_msg
     
-    def get_current_branch(self, repo_path: str) -> str:
+    def get_repo_metadata(self, repo_path: str) -> Dict[str, str]:
         """
-        Get current branch of repository.
+        Get current branch and short commit hash of a repository in one call.
+        
+        Answered locally for the checkout made by clone_repository; otherwise
+        both values come from a single SSH exec.
         
         Args:
             repo_path: Path to repository on remote instance
             
         Returns:
-            Current branch name
+            Dictionary with 'branch' and 'commit' ("unknown" if unavailable)
         """
+        if repo_path == self.last_clone_path and self.last_branch and self.last_commit_hash:
+            return {'branch': self.last_branch, 'commit': self.last_commit_hash[:8]}
+        
         try:
-            command = f"cd {repo_path} && git branch --show-current"
+            command = f"cd {repo_path} && git rev-parse --abbrev-ref HEAD && git rev-parse --short=8 HEAD"
             exit_code, stdout, stderr = self.ssh.execute_command(command)
             
-            if exit_code == 0:
-                return stdout.strip()
+            lines = stdout.strip().split('\n')
+            if exit_code == 0 and len(lines) == 2:
+                branch, commit = lines[0].strip(), lines[1].strip()
+                if repo_path == self.last_clone_path:
+                    self.last_branch = branch
+                return {'branch': branch, 'commit': commit}
             else:
-                return "unknown"
+                return {'branch': 'unknown', 'commit': 'unknown'}
                 
         except Exception as e:
-            logger.error(f"Error getting current branch: {str(e)}")
-            return "unknown"
+            logger.error(f"Error getting repository metadata: {str(e)}")
+            return {'branch': 'unknown', 'commit': 'unknown'}
+    
+    def get_current_branch(self, repo_path: str) -> str:
+        """
+        Get current branch of repository.
+        
+        Args:
+            repo_path: Path to repository on remote instance
+            
+        Returns:
+            Current branch name
+        """
+        return self.get_repo_metadata(repo_path)['branch']
     
     def get_commit_hash(self, repo_path: str) -> str:
         """
@@ -224,23 +443,16 @@ class GitHubManager:
         Returns:
             Current commit hash
         """
-        try:
-            command = f"cd {repo_path} && git rev-parse HEAD"
-            exit_code, stdout, stderr = self.ssh.execute_command(command)
-            
-            if exit_code == 0:
-                return stdout.strip()[:8]  # Short hash
-            else:
-                return "unknown"
-                
-        except Exception as e:
-            logger.error(f"Error getting commit hash: {str(e)}")
-            return "unknown"
+        return self.get_repo_metadata(repo_path)['commit']
     
     def verify_project_files(self, repo_path: str, required_files: list = None) -> Tuple[bool, list]:
         """
         Verify that required files exist in the repository.
         
+        For the commit checked out by clone_repository the result is cached
+        for a couple of minutes across managers, so redeploying the same
+        commit skips the SSH round-trip.
+        
         Args:
             repo_path: Path to repository on remote instance
             required_files: List of required files (default: ['Dockerfile'])
@@ -251,17 +463,33 @@ class GitHubManager:
         if required_files is None:
             required_files = ['Dockerfile']
         
+        cache_key = None
+        if repo_path == self.last_clone_path and self.last_repo and self.last_commit_hash:
+            cache_key = (*self.last_repo, self.last_branch, self.last_commit_hash,
+                         tuple(required_files))
+            cached = _verify_cache_get(cache_key)
+            if cached is not None:
+                logger.info(f"Project files for {self.last_commit_hash[:8]} already verified (cached)")
+                return cached[0], list(cached[1])
+        
         try:
             logger.info(f"Verifying project files in {repo_path}")
             
-            missing_files = []
+            # Probe every file in one SSH exec; prints "OK <file>" or "MISS <file>"
+            quoted = ' '.join(shlex.quote(f) for f in required_files)
+            command = (
+                f"cd {repo_path} && for f in {quoted}; do "
+                f"[ -f \"$f\" ] && echo \"OK $f\" || echo \"MISS $f\"; done"
+            )
+            exit_code, stdout, stderr = self.ssh.execute_command(command)
             
-            for file in required_files:
-                command = f"test -f {repo_path}/{file} && echo 'exists' || echo 'missing'"
-                exit_code, stdout, stderr = self.ssh.execute_command(command)
-                
-                if 'missing' in stdout:
-                    missing_files.append(file)
+            if exit_code != 0:
+                logger.error(f"Could not check project files: {stderr}")
+                return False, required_files
+            
+            missing_files = [line[5:] for line in stdout.splitlines() if line.startswith('MISS ')]
+            if cache_key is not None:
+                _verify_cache_put(cache_key, (not missing_files, list(missing_files)))
             
             if missing_files:
                 logger.warning(f"Missing required files: {missing_files}")
@@ -275,5 +503,5 @@ class GitHubManager:
             return False, required_files
     
     def close(self):
-        """Close SSH connection."""
-        self.ssh.close()
+        """Release SSH connection (closed once no other manager uses it)."""
+        SSHConnectionPool.release(self.ssh)
@@ -3,13 +3,67 @@ NGINX Manager for the Automated Deployment Framework.
 Handles NGINX installation, configuration, and management on remote EC2 instances.
 """
 
+import io
 import logging
+import re
+import shlex
+import string
 import time
-from typing import Dict, Optional, Tuple
-from ...core.utils import SSHClient
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from ...config import config
+from ...core.utils import RemoteCommandError, SSHConnectionPool, run_on_hosts
 
 logger = logging.getLogger(__name__)
 
+# Default ceiling on concurrent SSH sessions opened by NginxPool; stays
+# under sshd's default MaxStartups (10:30:100) when hosts sit behind one
+# bastion and keeps the thread count bounded for large fleets
+MAX_CONCURRENT_HOSTS = 32
+
+# Fixed commands, pre-encoded once for SSHClient.execute_command
+_CMD_RELOAD = b"sudo systemctl reload nginx"
+_CMD_RELOAD_NO_BLOCK = b"sudo systemctl reload --no-block nginx"
+_CMD_STATUS = b"sudo systemctl is-active nginx"
+
+# Where install_nginx(use_prebuilt_deb=True) keeps downloaded packages
+DEB_CACHE_DIR = '/var/cache/deploy'
+
+# Site configuration written by create_site_config(). Built once at import;
+# NGINX's own variables are escaped as $$name.
+_NGINX_SITE_TMPL = string.Template("""server {
+    listen 80;
+    server_name $server_name;
+    
+    # Application proxy
+    location / {
+        proxy_pass http://127.0.0.1:$proxy_port;
+        proxy_http_version 1.1;
+        
+        # Proxy headers
+        proxy_set_header Host $$host;
+        proxy_set_header X-Real-IP $$remote_addr;
+        proxy_set_header X-Forwarded-For $$proxy_add_x_forwarded_for;
+        proxy_set_header X-Forwarded-Proto $$scheme;
+        
+        # WebSocket support
+        proxy_set_header Upgrade $$http_upgrade;
+        proxy_set_header Connection "upgrade";
+        
+        # Timeouts
+        proxy_connect_timeout 60s;
+        proxy_send_timeout 60s;
+        proxy_read_timeout 60s;
+    }
+    
+    # Health check endpoint
+    location /health {
+        access_log off;
+        return 200 "healthy\\n";
+        add_header Content-Type text/plain;
+    }
+}
+""")
+
 
 class NginxManager:
     """Manages NGINX operations on remote EC2 instances."""
@@ -23,8 +77,11 @@ class NginxManager:
             username: SSH username
             key_file: Path to private key file
         """
-        self.ssh = SSHClient(hostname, username, key_file)
+        # Shared with the other managers connected to the same host
+        self.ssh = SSHConnectionPool.get(hostname, username, key_file)
         self.hostname = hostname
+        # Short-lived probe results: {key: (timestamp, value)}
+        self._cache: Dict[str, Tuple[float, Any]] = {}
         
     def connect(self, max_wait: int = 180, retry_interval: int = 5,
                 progress_callback: Optional[callable] = None) -> None:
@@ -42,14 +99,56 @@ class NginxManager:
         """
         self.ssh.connect(max_wait, retry_interval, progress_callback)
     
-    def install_nginx(self) -> Tuple[bool, str]:
+    def _cached(self, key: str, ttl: float, fn: Callable[[], Any]) -> Any:
+        """
+        Return fn()'s result, reusing it for `ttl` seconds.
+        
+        Status probes are polled by the orchestration flow; within the TTL a
+        repeat call costs no SSH round trip.
+        
+        Args:
+            key: Cache key
+            ttl: Seconds a stored result stays valid (0 = always refresh)
+            fn: Probe to run on a miss
+            
+        Returns:
+            Cached or fresh result
+        """
+        hit = self._cache.get(key)
+        if ttl > 0 and hit and time.monotonic() - hit[0] < ttl:
+            return hit[1]
+        value = fn()
+        self._cache[key] = (time.monotonic(), value)
+        return value
+    
+    def _invalidate(self):
+        """Drop cached probe results after a state-changing operation."""
+        self._cache.clear()
+    
+    def install_nginx(self, use_prebuilt_deb: Optional[bool] = None) -> Tuple[bool, str]:
         """
         Install NGINX on the remote instance.
         
+        Args:
+            use_prebuilt_deb: Install the package at config.NGINX_DEB_URL with
+                              dpkg instead of apt (default: when it is set).
+                              Falls back to apt if that fails.
+        
         Returns:
             Tuple of (success, message)
         """
+        if use_prebuilt_deb is None:
+            use_prebuilt_deb = bool(config.NGINX_DEB_URL)
+        
         try:
+            self._invalidate()
+            
+            if use_prebuilt_deb and config.NGINX_DEB_URL:
+                success, message = self._install_nginx_deb(config.NGINX_DEB_URL)
+                if success:
+                    return success, message
+                logger.warning(f"Prebuilt NGINX package failed, falling back to apt: {message}")
+            
             logger.info("Installing NGINX on remote instance...")
             
             # NGINX installation commands for Ubuntu
@@ -60,50 +159,92 @@ class NginxManager:
                 # Install NGINX and certbot
                 f"{APT} install -y nginx",
                 
-                # Start NGINX service
-                "sudo systemctl start nginx",
-                
-                # Enable NGINX to start on boot
-                "sudo systemctl enable nginx",
+                # Enable on boot and start in one systemd call
+                "sudo systemctl enable --now nginx",
                 
                 # Verify installation
                 "nginx -v"
             ]
             
-            results = self.ssh.execute_commands(install_commands, stop_on_error=True)
+            # One exec channel for the whole sequence; the step markers on
+            # stdout tell us which command a failure stopped at
+            script = []
+            for i, cmd in enumerate(install_commands, 1):
+                script.append(f"echo '::step {i}::'")
+                script.append(cmd)
+            
+            exit_code, stdout, stderr = self.ssh.execute_script(script)
             
-            # Check if all commands succeeded
-            if all(result[0] == 0 for result in results):
+            if exit_code == 0:
                 logger.info("NGINX installed successfully")
                 
-                # Get NGINX version
-                version_output = results[-1][2].strip()  # nginx outputs version to stderr
+                # nginx -v prints its version to stderr
+                version_output = next((line for line in stderr.splitlines()
+                                       if line.startswith('nginx version')), '').strip()
                 return True, f"NGINX installed successfully: {version_output}"
             else:
-                # Find first failed command
-                for i, result in enumerate(results):
-                    if result[0] != 0:
-                        error_msg = f"Failed at command {i+1}: {install_commands[i]}\nError: {result[2]}"
-                        logger.error(error_msg)
-                        return False, error_msg
+                steps = re.findall(r"^::step (\d+)::$", stdout, re.MULTILINE)
+                step = int(steps[-1]) if steps else 1
+                error_msg = f"Failed at command {step}: {install_commands[step - 1]}\nError: {stderr[-2000:]}"
+                logger.error(error_msg)
+                return False, error_msg
                         
         except Exception as e:
             error_msg = f"Error installing NGINX: {str(e)}"
             logger.error(error_msg)
             return False, error_msg
     
-    def check_nginx_installed(self) -> bool:
+    def _install_nginx_deb(self, url: str) -> Tuple[bool, str]:
+        """
+        Install NGINX from a pre-staged .deb, downloading it at most once.
+        
+        The package is kept in DEB_CACHE_DIR, so a re-deploy to the same
+        instance skips the download; no apt metadata refresh is needed.
+        
+        Args:
+            url: https:// or s3:// URL of the package
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        logger.info(f"Installing NGINX from prebuilt package {url}")
+        
+        deb = f"{DEB_CACHE_DIR}/{url.rstrip('/').rsplit('/', 1)[-1]}"
+        quoted_url = shlex.quote(url)
+        if url.startswith('s3://'):
+            fetch = f"sudo aws s3 cp --only-show-errors {quoted_url} {deb}.part"
+        else:
+            fetch = f"sudo curl -fsSL --retry 3 -o {deb}.part {quoted_url}"
+        
+        exit_code, stdout, stderr = self.ssh.execute_script([
+            f"sudo mkdir -p {DEB_CACHE_DIR}",
+            f"[ -s {deb} ] || {{ {fetch} && sudo mv {deb}.part {deb}; }}",
+            f"sudo DEBIAN_FRONTEND=noninteractive dpkg -i --force-confdef --force-confold {deb}",
+            "sudo systemctl enable --now nginx",
+            "nginx -v",
+        ])
+        
+        if exit_code != 0:
+            return False, stderr[-2000:]
+        
+        version_output = next((line for line in stderr.splitlines()
+                               if line.startswith('nginx version')), '').strip()
+        return True, f"NGINX installed from prebuilt package: {version_output}"
+    
+    def check_nginx_installed(self, ttl: float = 5.0) -> bool:
         """
         Check if NGINX is already installed.
         
+        Args:
+            ttl: Reuse a result younger than this many seconds (0 = re-check)
+            
         Returns:
             True if NGINX is installed
         """
-        try:
-            exit_code, stdout, stderr = self.ssh.execute_command("nginx -v")
-            return exit_code == 0
-        except:
-            return False
+        # `command -v` is a shell builtin: no nginx process is started
+        return self._cached(
+            'installed', ttl,
+            lambda: self.ssh.try_execute(b"command -v nginx >/dev/null")[0] == 0)
     
     def create_site_config(self, 
                           app_name: str,
@@ -126,59 +267,19 @@ class NginxManager:
             logger.info(f"Creating NGINX configuration for {app_name}")
             
             # Generate NGINX configuration
-            nginx_config = f"""server {{
-    listen 80;
-    server_name {server_name};
-    
-    # Application proxy
-    location / {{
-        proxy_pass http://127.0.0.1:{proxy_port};
-        proxy_http_version 1.1;
-        
-        # Proxy headers
-        proxy_set_header Host $host;
-        proxy_set_header X-Real-IP $remote_addr;
-        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
-        proxy_set_header X-Forwarded-Proto $scheme;
-        
-        # WebSocket support
-        proxy_set_header Upgrade $http_upgrade;
-        proxy_set_header Connection "upgrade";
-        
-        # Timeouts
-        proxy_connect_timeout 60s;
-        proxy_send_timeout 60s;
-        proxy_read_timeout 60s;
-    }}
-    
-    # Health check endpoint
-    location /health {{
-        access_log off;
-        return 200 "healthy\\n";
-        add_header Content-Type text/plain;
-    }}
-}}
-"""
+            nginx_config = _NGINX_SITE_TMPL.substitute(server_name=server_name,
+                                                       proxy_port=proxy_port)
             
             # Write configuration to remote server
             config_path = f"/etc/nginx/sites-available/{app_name}"
             
-            # Create temporary file with config
-            temp_config = f"/tmp/{app_name}.conf"
-            
-            # Write config to temp file
-            write_cmd = f"cat > {temp_config} << 'EOF'\n{nginx_config}\nEOF"
-            exit_code, stdout, stderr = self.ssh.execute_command(write_cmd)
-            
-            if exit_code != 0:
-                return False, f"Failed to create config file: {stderr}"
-            
-            # Move to sites-available with sudo
-            move_cmd = f"sudo mv {temp_config} {config_path}"
-            exit_code, stdout, stderr = self.ssh.execute_command(move_cmd)
+            # Stream the config straight into place: one exec, no temp file
+            tee_cmd = f"sudo tee {config_path} >/dev/null"
+            exit_code, stdout, stderr = self.ssh.execute_command_with_input(
+                tee_cmd, io.BytesIO(nginx_config.encode('utf-8')))
             
             if exit_code != 0:
-                return False, f"Failed to move config file: {stderr}"
+                return False, f"Failed to write config file (tee exit {exit_code}): {stderr}"
             
             logger.info(f"NGINX configuration created at {config_path}")
             return True, f"Configuration created successfully"
@@ -188,37 +289,56 @@ class NginxManager:
             logger.error(error_msg)
             return False, error_msg
     
-    def enable_site(self, app_name: str) -> Tuple[bool, str]:
+    def enable_site(self, app_name: str, full_validate: bool = False) -> Tuple[bool, str]:
         """
         Enable NGINX site configuration.
         
+        The new site file is validated on its own first (wrapped in a minimal
+        events/http block), so the check costs the same however many sites
+        the host serves, and a broken file is never symlinked in.
+        
         Args:
             app_name: Application/deployment name
+            full_validate: Also run `nginx -t` over the whole /etc/nginx tree
+                           after enabling (e.g. once at the end of a batch).
+                           If it fails, the site is unlinked again and the
+                           default site restored, so the next reload still
+                           loads
             
         Returns:
             Tuple of (success, message)
         """
         try:
+            self._invalidate()
             logger.info(f"Enabling NGINX site: {app_name}")
             
-            # Remove default site if it exists
-            remove_default_cmd = "sudo rm -f /etc/nginx/sites-enabled/default"
-            self.ssh.execute_command(remove_default_cmd)
+            site_path = f"/etc/nginx/sites-available/{app_name}"
+            enabled_path = f"/etc/nginx/sites-enabled/{app_name}"
+            test_conf = f"/tmp/{app_name}.nginx-test.conf"
+            commands = [
+                f"printf 'events {{}}\\nhttp {{ include {site_path}; }}\\n' > {test_conf}"
+                f" && sudo nginx -t -q -c {test_conf}; rc=$?; rm -f {test_conf}; (exit $rc)",
+                # The stock default site is a symlink: remember its target
+                # (same shell for the whole batch) so it can be put back
+                "default_site=$(readlink /etc/nginx/sites-enabled/default); "
+                "sudo rm -f /etc/nginx/sites-enabled/default",
+                f"sudo ln -sf {site_path} {enabled_path}",
+            ]
+            if full_validate:
+                commands.append(
+                    f"sudo nginx -t || {{ rc=$?; sudo rm -f {enabled_path}; "
+                    f"[ -z \"$default_site\" ] || sudo ln -sf \"$default_site\" /etc/nginx/sites-enabled/default; "
+                    f"(exit $rc); }}")
             
-            # Create symlink to enable site
-            symlink_cmd = f"sudo ln -sf /etc/nginx/sites-available/{app_name} /etc/nginx/sites-enabled/{app_name}"
-            exit_code, stdout, stderr = self.ssh.execute_command(symlink_cmd)
+            # One channel; run_batch keeps per-command exit codes for error attribution
+            results = self.ssh.run_batch(commands)
             
+            exit_code, stdout, stderr = results[-1]
             if exit_code != 0:
+                if len(results) in (1, 4):
+                    return False, f"NGINX configuration test failed: {stderr}"
                 return False, f"Failed to enable site: {stderr}"
             
-            # Test NGINX configuration
-            test_cmd = "sudo nginx -t"
-            exit_code, stdout, stderr = self.ssh.execute_command(test_cmd)
-            
-            if exit_code != 0:
-                return False, f"NGINX configuration test failed: {stderr}"
-            
             logger.info(f"Site {app_name} enabled successfully")
             return True, "Site enabled successfully"
             
@@ -227,22 +347,28 @@ class NginxManager:
             logger.error(error_msg)
             return False, error_msg
     
-    def reload_nginx(self) -> Tuple[bool, str]:
+    def reload_nginx(self, no_block: bool = False) -> Tuple[bool, str]:
         """
         Reload NGINX configuration without dropping connections.
         
+        Args:
+            no_block: Return as soon as systemd has queued the job instead of
+                      waiting for it; follow with wait_reloaded()
+        
         Returns:
             Tuple of (success, message)
         """
         try:
+            self._invalidate()
             logger.info("Reloading NGINX configuration...")
             
-            reload_cmd = "sudo systemctl reload nginx"
+            reload_cmd = _CMD_RELOAD_NO_BLOCK if no_block else _CMD_RELOAD
             exit_code, stdout, stderr = self.ssh.execute_command(reload_cmd)
             
             if exit_code == 0:
-                logger.info("NGINX reloaded successfully")
-                return True, "NGINX reloaded successfully"
+                message = "NGINX reload queued" if no_block else "NGINX reloaded successfully"
+                logger.info(message)
+                return True, message
             else:
                 return False, f"Failed to reload NGINX: {stderr}"
                 
@@ -251,16 +377,55 @@ class NginxManager:
             logger.error(error_msg)
             return False, error_msg
     
-    def check_nginx_status(self) -> Dict:
+    def wait_reloaded(self, timeout: int = 10) -> Tuple[bool, str]:
+        """
+        Wait for a reload queued with reload_nginx(no_block=True) to finish.
+        
+        NGINX stays `active` through a reload, so this waits for systemd's
+        job queue to drain for nginx.service and then checks the unit is
+        still active. The poll loop runs on the instance (100ms interval) so
+        waiting costs one SSH round trip, not one per poll.
+        
+        Args:
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        try:
+            self._invalidate()
+            wait_cmd = (f"timeout {timeout} sh -c "
+                        "'while systemctl list-jobs --no-legend nginx.service | grep -q .; do sleep 0.1; done'"
+                        " && systemctl is-active nginx")
+            exit_code, stdout, stderr = self.ssh.execute_command(wait_cmd, timeout=timeout + 30)
+            
+            if exit_code == 0:
+                logger.info("NGINX reloaded successfully")
+                return True, "NGINX reloaded successfully"
+            else:
+                return False, f"NGINX reload not finished or NGINX not active after {timeout}s: {stdout}{stderr}"
+                
+        except Exception as e:
+            error_msg = f"Error waiting for NGINX reload: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
+    
+    def check_nginx_status(self, ttl: float = 5.0) -> Dict:
         """
         Check NGINX service status.
         
+        Args:
+            ttl: Reuse a result younger than this many seconds (0 = re-check)
+            
         Returns:
             Dictionary with NGINX status information
         """
+        return dict(self._cached('status', ttl, self._probe_status))
+    
+    def _probe_status(self) -> Dict:
+        """Query systemd for the NGINX service state (uncached)."""
         try:
-            status_cmd = "sudo systemctl is-active nginx"
-            exit_code, stdout, stderr = self.ssh.execute_command(status_cmd)
+            exit_code, stdout, stderr = self.ssh.execute_command(_CMD_STATUS)
             
             is_running = (exit_code == 0 and stdout.strip() == 'active')
             
@@ -278,28 +443,76 @@ class NginxManager:
                 'error': str(e)
             }
     
-    def get_nginx_logs(self, log_type: str = 'error', tail: int = 50) -> str:
+    def get_nginx_logs(self, log_type: str = 'error', tail: int = 50,
+                       max_bytes: int = 1024 * 1024) -> str:
         """
         Get NGINX logs.
         
         Args:
             log_type: Type of log ('access' or 'error')
             tail: Number of lines to retrieve
+            max_bytes: Stop reading (and close the remote tail) once this
+                       much has been received
             
         Returns:
             Log content
         """
         try:
-            log_file = f"/var/log/nginx/{log_type}.log"
-            command = f"sudo tail -n {tail} {log_file}"
-            exit_code, stdout, stderr = self.ssh.execute_command(command)
-            
-            return stdout if exit_code == 0 else f"Error reading logs: {stderr}"
-            
+            lines, size = [], 0
+            stream = self.stream_nginx_logs(log_type, tail)
+            try:
+                for line in stream:
+                    lines.append(line)
+                    size += len(line)
+                    if size >= max_bytes:
+                        lines.append(f"... truncated at {max_bytes} bytes\n")
+                        break
+            finally:
+                stream.close()
+            return ''.join(lines)
+            
+        except RemoteCommandError as e:
+            return f"Error reading logs: {e.output}"
         except Exception as e:
             logger.error(f"Error getting NGINX logs: {str(e)}")
             return f"Error: {str(e)}"
     
+    def stream_nginx_logs(self, log_type: str = 'error', tail: int = 50) -> Iterator[str]:
+        """
+        Yield NGINX log lines as they arrive over the SSH channel.
+        
+        Memory stays bounded for large tails, and the consumer can stop early;
+        closing the generator closes the channel, which ends the remote tail.
+        
+        Args:
+            log_type: Type of log ('access' or 'error')
+            tail: Number of lines to retrieve
+            
+        Yields:
+            Log lines, newline included
+            
+        Raises:
+            RemoteCommandError: The log could not be read (after all lines)
+        """
+        command = f"sudo tail -n {tail} /var/log/nginx/{log_type}.log"
+        stdout_file, stderr_file = self.ssh.execute_command(command, stream=True)
+        
+        try:
+            while True:
+                line = stdout_file.readline()
+                if not line:
+                    break
+                yield line.decode('utf-8', 'replace') if isinstance(line, bytes) else line
+            
+            exit_code = stdout_file.channel.recv_exit_status()
+            if exit_code != 0:
+                error = stderr_file.read()
+                if isinstance(error, bytes):
+                    error = error.decode('utf-8', 'replace')
+                raise RemoteCommandError(command, exit_code, error)
+        finally:
+            stdout_file.channel.close()
+    
     def disable_site(self, app_name: str) -> Tuple[bool, str]:
         """
         Disable NGINX site configuration.
@@ -311,16 +524,20 @@ class NginxManager:
             Tuple of (success, message)
         """
         try:
+            self._invalidate()
             logger.info(f"Disabling NGINX site: {app_name}")
             
-            # Remove symlink
-            remove_cmd = f"sudo rm -f /etc/nginx/sites-enabled/{app_name}"
-            exit_code, stdout, stderr = self.ssh.execute_command(remove_cmd)
+            # Remove symlink and reload in one exec
+            results = self.ssh.run_batch([
+                f"sudo rm -f /etc/nginx/sites-enabled/{app_name}",
+                "sudo systemctl reload nginx",
+            ])
             
+            exit_code, stdout, stderr = results[-1]
             if exit_code == 0:
-                # Reload NGINX
-                self.reload_nginx()
                 return True, f"Site {app_name} disabled successfully"
+            elif len(results) == 2:
+                return False, f"Site {app_name} disabled but NGINX reload failed: {stderr}"
             else:
                 return False, f"Failed to disable site: {stderr}"
                 
@@ -330,5 +547,99 @@ class NginxManager:
             return False, error_msg
     
     def close(self):
-        """Close SSH connection."""
-        self.ssh.close()
+        """Release SSH connection (closed once no other manager uses it)."""
+        if self.ssh is not None:
+            SSHConnectionPool.release(self.ssh)
+            self.ssh = None
+    
+    def __enter__(self) -> 'NginxManager':
+        """
+        Connect (with the default retry settings) for a `with` block:
+        
+            with NginxManager(ip, key_file='key.pem') as nginx:
+                nginx.install_nginx()
+        
+        The pooled connection is released on exit, even if the block raises.
+        """
+        self.connect()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class NginxPool:
+    """
+    Runs NginxManager operations on several instances concurrently.
+    
+    Same model as DeployPool: paramiko releases the GIL while it waits on
+    the network, so a thread per host turns N serial installs into roughly
+    the time of the slowest one. Each method returns
+    {hostname: (success, message)}; one host failing does not stop the rest.
+    
+        pool = NginxPool(['1.2.3.4', '5.6.7.8'], key_file='key.pem')
+        pool.connect()
+        pool.install_nginx()
+        pool.create_site_config('app', 8000)
+        pool.enable_site('app')
+        pool.reload_nginx()
+        pool.close()
+    """
+    
+    def __init__(self, hostnames: List[str], username: str = 'ubuntu',
+                 key_file: Optional[str] = None, max_workers: Optional[int] = None):
+        """
+        Initialize the pool.
+        
+        Args:
+            hostnames: EC2 instance public IPs or DNS names
+            username: SSH username
+            key_file: Path to private key file
+            max_workers: Concurrent hosts (default: one thread per host,
+                         at most MAX_CONCURRENT_HOSTS)
+        """
+        self.managers = {host: NginxManager(host, username, key_file) for host in hostnames}
+        self.max_workers = max_workers or min(max(len(hostnames), 1), MAX_CONCURRENT_HOSTS)
+    
+    def _run_all(self, operation: Callable[[NginxManager], Tuple[bool, str]],
+                 name: str) -> Dict[str, Tuple[bool, str]]:
+        """Run operation(manager) for every host concurrently (see run_on_hosts)."""
+        return run_on_hosts(self.managers, operation, name, self.max_workers)
+    
+    def connect(self, max_wait: int = 180, retry_interval: int = 5) -> Dict[str, Tuple[bool, str]]:
+        """Establish SSH connections to all hosts concurrently."""
+        def _connect(manager: NginxManager) -> Tuple[bool, str]:
+            manager.connect(max_wait, retry_interval)
+            return True, "Connected"
+        return self._run_all(_connect, 'connect')
+    
+    def install_nginx(self) -> Dict[str, Tuple[bool, str]]:
+        """Install NGINX on all hosts concurrently."""
+        return self._run_all(lambda m: m.install_nginx(), 'install_nginx')
+    
+    def create_site_config(self, app_name: str, proxy_port: int,
+                           server_name: str = "_") -> Dict[str, Tuple[bool, str]]:
+        """Write the site configuration on all hosts concurrently."""
+        return self._run_all(
+            lambda m: m.create_site_config(app_name, proxy_port, server_name),
+            'create_site_config')
+    
+    def enable_site(self, app_name: str, full_validate: bool = False) -> Dict[str, Tuple[bool, str]]:
+        """Enable the site on all hosts concurrently."""
+        return self._run_all(lambda m: m.enable_site(app_name, full_validate), 'enable_site')
+    
+    def reload_nginx(self) -> Dict[str, Tuple[bool, str]]:
+        """
+        Reload NGINX on all hosts concurrently.
+        
+        Every host's reload is queued first (--no-block), then all of them
+        are awaited, so the reloads run in parallel on the instances.
+        """
+        queued = self._run_all(lambda m: m.reload_nginx(no_block=True), 'reload_nginx')
+        return self._run_all(lambda m: m.wait_reloaded() if queued[m.hostname][0]
+                             else queued[m.hostname], 'wait_reloaded')
+    
+    def close(self):
+        """Release all SSH connections."""
+        for manager in self.managers.values():
+            manager.close()
@@ -9,12 +9,17 @@ Phase 3 changes:
   - Survives server restarts: deployments are durable
 """
 
+import contextvars
+import functools
 import logging
+import threading
 import time
 import uuid
-from typing import Dict, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Callable
 from datetime import datetime
 
+from sqlalchemy import func
 from ..providers.aws.aws_manager import AWSManager
 from ..providers.docker.docker_manager import DockerManager
 from ..providers.github.github_manager import GitHubManager
@@ -27,6 +32,7 @@ from ..config import config
 
 # ── Database imports ──────────────────────────────────────────────────────────
 from ..database.connection import SessionLocal
+from ..database.models import Application
 from ..database.repositories import (
     TenantRepository,
     ApplicationRepository,
@@ -36,6 +42,23 @@ from ..database.repositories import (
 
 logger = logging.getLogger(__name__)
 
+# Pure functions of the repo URL, called on every (re)deploy of the same
+# handful of repos; results are immutable tuples/strings, safe to share.
+# validate_deployment_config takes a dict and is left uncached.
+_validate_github_url = functools.lru_cache(maxsize=1024)(validate_github_url)
+_parse_github_url    = functools.lru_cache(maxsize=1024)(parse_github_url)
+_sanitize_name       = functools.lru_cache(maxsize=1024)(sanitize_name)
+
+# Failed-deployment cleanup (instance termination) runs here, detached from
+# deploy(), so a failing deploy returns without waiting on the EC2 API.
+_cleanup_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='deploy-cleanup')
+
+# Read-side cache TTLs (seconds) for dashboards polling status/list
+STATUS_CACHE_TTL = 1.0
+TERMINAL_STATUS_CACHE_TTL = 300.0   # success/failed rows no longer change
+_TERMINAL_STATUSES = frozenset({'success', 'failed'})
+_QUERY_CACHE_MAX = 512
+
 
 class DeploymentOrchestrator:
     """Orchestrates the complete deployment workflow."""
@@ -46,6 +69,9 @@ class DeploymentOrchestrator:
         # ── NOTE: self.deployments dict is GONE ──────────────────────────────
         # All state now lives in the database. Use list_deployments() and
         # get_deployment_status() which query the DB.
+        # key -> (expires_at, value); shared by the API's request threads
+        self._query_cache: Dict[Any, tuple] = {}
+        self._query_cache_lock = threading.Lock()
 
     # ─────────────────────────────────────────────────────────────────────────
     # Main deploy() method
@@ -72,7 +98,10 @@ class DeploymentOrchestrator:
         # ── Open a dedicated DB session for this deployment ──────────────────
         # Deployment runs in a background thread, so it needs its own session
         # (it can't share the Flask request-scoped session).
-        db = SessionLocal()
+        # expire_on_commit=False: reading dep/application attributes after a
+        # commit must not re-SELECT and pin a pooled connection through the
+        # next EC2/SSH wait (see DeploymentRepository.checkpoint).
+        db = SessionLocal(expire_on_commit=False)
         dep_repo   = DeploymentRepository(db)
         tenant_repo = TenantRepository(db)
         app_repo   = ApplicationRepository(db)
@@ -88,6 +117,10 @@ class DeploymentOrchestrator:
         }
 
         dep = None   # Deployment ORM object — used in except block too
+        # SSH-backed managers, released in `finally` whatever the outcome
+        docker_manager = github_manager = nginx_manager = None
+        # Worker thread for steps that overlap the main sequence (clone, NGINX site)
+        side_pool = None
 
         try:
             # ── Resolve tenant (single-tenant: always 'default') ─────────────
@@ -102,26 +135,27 @@ class DeploymentOrchestrator:
                 if status == 'error':
                     logger.error(f"[{status.upper()}] {step}: {message}")
                 else:
-                    logger.info(f"[{status.upper()}] {step}: {message}")
-                    
+                    # Deferred formatting: called for every step and SSH wait line
+                    logger.info('[%s] %s: %s', status.upper(), step, message)
+
                 result['steps'].append({
                     'step': step,
                     'message': message,
                     'status': status,
-                    'timestamp': datetime.now().isoformat(),
+                    'timestamp': time.time(),   # ISO-formatted once, in `finally`
                 })
                 # Write to DB log if we have a deployment record
+                # (committed with the rest of the deployment transaction)
                 if dep:
                     dep_repo.add_log(dep.id, f"[{step}] {message}",
                                      level='ERROR' if status == 'error' else 'INFO')
-                    db.commit()
 
                 if progress_callback:
                     progress_callback(step, message, status, data)
 
             # ── Step 1: Validate GitHub URL ───────────────────────────────────
             update_progress('Validation', 'Validating GitHub URL', 'in_progress')
-            is_valid, error = validate_github_url(github_url)
+            is_valid, error = _validate_github_url(github_url)
             if not is_valid:
                 raise ValueError(f"Invalid GitHub URL: {error}")
             update_progress('Validation', 'GitHub URL validated', 'success')
@@ -138,8 +172,8 @@ class DeploymentOrchestrator:
             update_progress('Validation', 'Configuration validated', 'success')
 
             # ── Step 2.5: Resolve/create Application record ───────────────────
-            _, repo_name = parse_github_url(github_url)
-            app_name = sanitize_name(repo_name)
+            _, repo_name = _parse_github_url(github_url)
+            app_name = _sanitize_name(repo_name)
 
             application = app_repo.get_or_create(
                 tenant_id=tenant.id,
@@ -150,9 +184,10 @@ class DeploymentOrchestrator:
                 branch='main',
                 status='pending',
             )
-            db.commit()
 
             # ── Step 2.6: Create Deployment record in DB ──────────────────────
+            # One commit for the application + deployment rows, so crash
+            # recovery sees the deployment as soon as it has started
             dep = dep_repo.create(
                 tenant_id=tenant.id,
                 application_id=application.id,
@@ -165,246 +200,257 @@ class DeploymentOrchestrator:
             logger.info('Deployment record created: short_id=%s (db_id=%s...)',
                         dep.short_id, dep.id[:8])
 
-            # ── Step 3: Create EC2 instance ───────────────────────────────────
-            update_progress('EC2 Creation', 'Creating EC2 instance', 'in_progress')
-
-            if instance_name is None:
-                instance_name = f"autodeploy-{sanitize_name(repo_name)}-{dep.short_id}"
-
-            instance_info = self.aws_manager.create_instance(instance_name)
-            result['instance_id'] = instance_info['instance_id']
-            result['public_ip']   = instance_info['public_ip']
-
-            # Persist EC2 instance to DB
-            ec2_record = ec2_repo.create(
-                aws_instance_id=instance_info['instance_id'],
-                public_ip=instance_info['public_ip'],
-                instance_type=instance_info.get('instance_type', config.EC2_INSTANCE_TYPE),
-                region=config.AWS_REGION,
-            )
-            # Link application → instance
-            ec2_repo.link_application(
-                app_id=application.id,
-                instance_db_id=ec2_record.id,
-                host_port=host_port or config.DOCKER_HOST_PORT,
-            )
-            dep_repo.add_step(dep.id, 1, 'EC2 Instance Created', 'success',
-                              message=f"id={instance_info['instance_id']} ip={instance_info['public_ip']}")
-            db.commit()
-
-            update_progress('EC2 Creation',
-                           f"Instance {instance_info['instance_id']} created",
-                           'success', {'public_ip': instance_info['public_ip']})
-
-            # ── Step 4: SSH + Docker ──────────────────────────────────────────
-            update_progress('Docker Installation',
-                           'Waiting for SSH and installing Docker', 'in_progress')
-
-            docker_manager = DockerManager(
-                instance_info['public_ip'],
-                key_file=f"{config.AWS_KEY_PAIR_NAME}.pem"
-            )
-            try:
-                docker_manager.connect(max_wait=180, retry_interval=5,
-                                       progress_callback=progress_callback)
-            except TimeoutError as e:
-                raise Exception(f"SSH connection timeout: {e}")
-            except Exception as e:
-                raise Exception(f"Failed to establish SSH connection: {e}")
-
-            docker_installed, docker_msg = docker_manager.install_docker()
-            if not docker_installed:
-                raise Exception(f"Failed to install Docker: {docker_msg}")
-
-            dep_repo.add_step(dep.id, 2, 'Docker Installed', 'success')
-            db.commit()
-            update_progress('Docker Installation', 'Docker installed', 'success')
-
-            # ── Step 4.5: NGINX (optional) ────────────────────────────────────
-            nginx_manager = None
-            if config.ENABLE_NGINX:
-                update_progress('NGINX Installation',
-                               'Installing NGINX reverse proxy', 'in_progress')
-                nginx_manager = NginxManager(
-                    instance_info['public_ip'],
-                    key_file=f"{config.AWS_KEY_PAIR_NAME}.pem"
-                )
+            # ── Steps 3-10 run in deployment_session ─────────────────────────
+            # Steps, logs and status updates are committed together when the
+            # block exits, plus a checkpoint() after the EC2 instance and the
+            # container are up (see DeploymentRepository.deployment_session).
+            with dep_repo.deployment_session():
+                # ── Step 3: Create EC2 instance ───────────────────────────────
+                update_progress('EC2 Creation', 'Creating EC2 instance', 'in_progress')
+
+                if instance_name is None:
+                    instance_name = f"autodeploy-{app_name}-{dep.short_id}"
+
+                instance_info = self.aws_manager.create_instance(instance_name)
+                result['instance_id'] = instance_info['instance_id']
+                result['public_ip']   = instance_info['public_ip']
+
+                # Persist EC2 instance to DB and link application → instance
+                ec2_repo.create_many([{
+                    'aws_instance_id': instance_info['instance_id'],
+                    'public_ip':       instance_info['public_ip'],
+                    'instance_type':   instance_info.get('instance_type', config.EC2_INSTANCE_TYPE),
+                    'region':          config.AWS_REGION,
+                    'host_port':       host_port or config.DOCKER_HOST_PORT,
+                }], app_id=application.id)
+                dep_repo.add_step(dep.id, 1, 'EC2 Instance Created', 'success',
+                                  message=f"id={instance_info['instance_id']} ip={instance_info['public_ip']}")
+                # Durable before the SSH waits (and the instance is findable for cleanup)
+                dep_repo.checkpoint()
+
+                update_progress('EC2 Creation',
+                               f"Instance {instance_info['instance_id']} created",
+                               'success', {'public_ip': instance_info['public_ip']})
+
+                # ── Step 4: SSH + Docker ──────────────────────────────────────
+                update_progress('Docker Installation',
+                               'Waiting for SSH and installing Docker', 'in_progress')
+
+                # All three managers share one pooled SSH connection to the
+                # instance, so wait for SSH once, up front, for all of them
+                key_file = f"{config.AWS_KEY_PAIR_NAME}.pem"
+                docker_manager = DockerManager(instance_info['public_ip'], key_file=key_file)
+                github_manager = GitHubManager(instance_info['public_ip'], key_file=key_file)
+                if config.ENABLE_NGINX:
+                    nginx_manager = NginxManager(instance_info['public_ip'], key_file=key_file)
                 try:
-                    nginx_manager.connect(max_wait=180, retry_interval=5,
-                                          progress_callback=progress_callback)
+                    docker_manager.connect(max_wait=180, retry_interval=5,
+                                           progress_callback=progress_callback)
+                except TimeoutError as e:
+                    raise Exception(f"SSH connection timeout: {e}")
                 except Exception as e:
-                    raise Exception(f"SSH for NGINX failed: {e}")
-
-                nginx_installed, nginx_msg = nginx_manager.install_nginx()
-                if not nginx_installed:
-                    raise Exception(f"Failed to install NGINX: {nginx_msg}")
-
-                dep_repo.add_step(dep.id, 3, 'NGINX Installed', 'success')
-                db.commit()
-                update_progress('NGINX Installation', 'NGINX installed', 'success')
-
-            # ── Step 5: Clone repository ──────────────────────────────────────
-            update_progress('Repository Clone', 'Cloning GitHub repository', 'in_progress')
-
-            github_manager = GitHubManager(
-                instance_info['public_ip'],
-                key_file=f"{config.AWS_KEY_PAIR_NAME}.pem"
-            )
-            try:
-                github_manager.connect(max_wait=180, retry_interval=5,
-                                       progress_callback=progress_callback)
-            except Exception as e:
-                raise Exception(f"SSH for GitHub failed: {e}")
-
-            clone_success, clone_msg, repo_path = github_manager.clone_repository(
-                github_url, token=config.GITHUB_TOKEN)
-
-            if not clone_success:
-                raise Exception(f"Failed to clone repository: {clone_msg}")
-
-            result['repo_path'] = repo_path
-
-            dep_repo.add_step(dep.id, 4, 'Repository Cloned', 'success',
-                              message=repo_path)
-            db.commit()
-            update_progress('Repository Clone', f"Cloned to {repo_path}", 'success')
-
-            # ── Step 6: Verify project files ─────────────────────────────────
-            update_progress('Project Validation', 'Verifying project structure', 'in_progress')
-
-            files_exist, missing_files = github_manager.verify_project_files(repo_path)
-            if not files_exist:
-                raise Exception(f"Missing required files: {', '.join(missing_files)}")
-
-            dep_repo.add_step(dep.id, 5, 'Project Structure Verified', 'success')
-            db.commit()
-            update_progress('Project Validation', 'Project structure validated', 'success')
-
-            # ── Step 7: Build Docker image ────────────────────────────────────
-            update_progress('Docker Build', 'Building Docker image', 'in_progress')
-
-            image_name = sanitize_name(instance_name)
-            build_success, build_msg = docker_manager.build_image(repo_path, image_name)
-
-            if not build_success:
-                raise Exception(f"Failed to build Docker image: {build_msg}")
-
-            result['image_name'] = image_name
-            dep_repo.add_step(dep.id, 6, 'Docker Image Built', 'success',
-                              message=image_name)
-            db.commit()
-            update_progress('Docker Build', f"Image built: {image_name}", 'success')
-
-            # ── Step 8: Run container ─────────────────────────────────────────
-            update_progress('Container Deployment', 'Starting Docker container', 'in_progress')
-
-            container_name  = f"{image_name}-container"
-            container_port  = container_port or config.DOCKER_CONTAINER_PORT
-            host_port       = host_port or config.DOCKER_HOST_PORT
-            port_mapping    = {host_port: container_port}
-
-            run_success, run_msg = docker_manager.run_container(
-                f"{image_name}:latest",
-                container_name,
-                port_mapping,
-                restart_policy='unless-stopped',
-            )
-
-            if not run_success:
-                raise Exception(f"Failed to start container: {run_msg}")
-
-            result['container_name'] = container_name
-            result['port'] = host_port
-
-            # Update Application record with container details
-            db.query(application.__class__).filter_by(id=application.id).update({
-                'container_name': container_name,
-                'image_name': image_name,
-                'status': 'active',
-                'updated_at': datetime.utcnow(),
-            })
-            dep_repo.add_step(dep.id, 7, 'Container Started', 'success',
-                              message=container_name)
-            db.commit()
-            update_progress('Container Deployment',
-                           f"Container running: {container_name}", 'success')
-
-            # ── Step 8.5: Configure NGINX ─────────────────────────────────────
-            if config.ENABLE_NGINX and nginx_manager:
-                update_progress('NGINX Configuration',
-                               'Configuring NGINX reverse proxy', 'in_progress')
-
-                cfg_ok, cfg_msg = nginx_manager.create_site_config(
-                    app_name=instance_name,
-                    proxy_port=host_port,
-                    server_name='_',
+                    raise Exception(f"Failed to establish SSH connection: {e}")
+
+                # The clone runs on a worker thread (its own channel on the
+                # shared connection) and is collected at Step 5. Steps, DB
+                # writes and progress events stay on this thread, in order.
+                # copy_context() carries the deployment id into the worker's
+                # log records.
+                side_pool = ThreadPoolExecutor(max_workers=1)
+                clone_future = None
+                if github_manager.transport == 'archive':
+                    # Streamed from the local cache, no apt on the instance:
+                    # start it now so it overlaps the Docker install. A failed
+                    # archive is retried with git on this thread at Step 5.
+                    clone_future = side_pool.submit(
+                        contextvars.copy_context().run,
+                        github_manager.clone_repository, github_url,
+                        token=config.GITHUB_TOKEN, transport='archive')
+
+                docker_installed, docker_msg = docker_manager.install_docker(
+                    progress_callback=progress_callback)
+                if not docker_installed:
+                    raise Exception(f"Failed to install Docker: {docker_msg}")
+
+                dep_repo.add_step(dep.id, 2, 'Docker Installed', 'success')
+                update_progress('Docker Installation', 'Docker installed', 'success')
+
+                if clone_future is None:
+                    # git comes from apt too: install it here, after
+                    # install_docker has waited for cloud-init and released the
+                    # dpkg lock, so the clone never runs apt next to another
+                    # apt job; it then overlaps the NGINX install
+                    git_installed, git_msg = github_manager.install_git()
+                    if not git_installed:
+                        raise Exception(f"Failed to install Git: {git_msg}")
+                    clone_future = side_pool.submit(
+                        contextvars.copy_context().run,
+                        github_manager.clone_repository, github_url,
+                        token=config.GITHUB_TOKEN, transport='git')
+
+                # ── Step 4.5: NGINX (optional) ────────────────────────────────
+                if nginx_manager:
+                    update_progress('NGINX Installation',
+                                   'Installing NGINX reverse proxy', 'in_progress')
+
+                    nginx_installed, nginx_msg = nginx_manager.install_nginx()
+                    if not nginx_installed:
+                        raise Exception(f"Failed to install NGINX: {nginx_msg}")
+
+                    dep_repo.add_step(dep.id, 3, 'NGINX Installed', 'success')
+                    update_progress('NGINX Installation', 'NGINX installed', 'success')
+
+                # ── Step 5: Clone repository ──────────────────────────────────
+                update_progress('Repository Clone', 'Cloning GitHub repository', 'in_progress')
+
+                clone_success, clone_msg, repo_path = clone_future.result()
+
+                if not clone_success and github_manager.transport == 'archive':
+                    # Fall back to git on the instance here, on this thread:
+                    # the Docker and NGINX apt jobs are done by now
+                    logger.warning('%s, falling back to git clone on the instance', clone_msg)
+                    clone_success, clone_msg, repo_path = github_manager.clone_repository(
+                        github_url, token=config.GITHUB_TOKEN, transport='git')
+
+                if not clone_success:
+                    raise Exception(f"Failed to clone repository: {clone_msg}")
+
+                result['repo_path'] = repo_path
+
+                dep_repo.add_step(dep.id, 4, 'Repository Cloned', 'success',
+                                  message=repo_path)
+                update_progress('Repository Clone', f"Cloned to {repo_path}", 'success')
+
+                # ── Step 6: Verify project files ─────────────────────────────
+                update_progress('Project Validation', 'Verifying project structure', 'in_progress')
+
+                files_exist, missing_files = github_manager.verify_project_files(repo_path)
+                if not files_exist:
+                    raise Exception(f"Missing required files: {', '.join(missing_files)}")
+
+                dep_repo.add_step(dep.id, 5, 'Project Structure Verified', 'success')
+                update_progress('Project Validation', 'Project structure validated', 'success')
+
+                container_port  = container_port or config.DOCKER_CONTAINER_PORT
+                host_port       = host_port or config.DOCKER_HOST_PORT
+
+                # The NGINX site only depends on the host port: write and
+                # validate it while the image builds. Nothing is reloaded
+                # until the container is up (Step 8.5).
+                if nginx_manager:
+                    nginx_future = side_pool.submit(
+                        contextvars.copy_context().run,
+                        self._prepare_nginx_site, nginx_manager, instance_name, host_port)
+
+                # ── Step 7: Build Docker image ────────────────────────────────
+                update_progress('Docker Build', 'Building Docker image', 'in_progress')
+
+                image_name = sanitize_name(instance_name)   # unique per deploy: not cached
+                build_success, build_msg = docker_manager.build_image(repo_path, image_name)
+
+                if not build_success:
+                    # Keep the complete build output in S3; log rows are capped
+                    dep_repo.add_log_blob(dep.id, build_msg.encode('utf-8'), level='ERROR')
+                    raise Exception(f"Failed to build Docker image: {build_msg}")
+
+                result['image_name'] = image_name
+                dep_repo.add_step(dep.id, 6, 'Docker Image Built', 'success',
+                                  message=image_name)
+                update_progress('Docker Build', f"Image built: {image_name}", 'success')
+
+                # ── Step 8: Run container ─────────────────────────────────────
+                update_progress('Container Deployment', 'Starting Docker container', 'in_progress')
+
+                container_name  = f"{image_name}-container"
+                port_mapping    = {host_port: container_port}
+
+                run_success, run_msg = docker_manager.run_container(
+                    f"{image_name}:latest",
+                    container_name,
+                    port_mapping,
+                    restart_policy='unless-stopped',
                 )
-                if not cfg_ok:
-                    raise Exception(f"NGINX config failed: {cfg_msg}")
 
-                en_ok, en_msg = nginx_manager.enable_site(instance_name)
-                if not en_ok:
-                    raise Exception(f"NGINX enable failed: {en_msg}")
-
-                rl_ok, rl_msg = nginx_manager.reload_nginx()
-                if not rl_ok:
-                    raise Exception(f"NGINX reload failed: {rl_msg}")
-
-                dep_repo.add_step(dep.id, 8, 'NGINX Configured', 'success')
-                db.commit()
-                update_progress('NGINX Configuration', 'NGINX configured', 'success')
-                health_check_port = 80
-            else:
-                health_check_port = host_port
-
-            # ── Step 9: Health check ──────────────────────────────────────────
-            update_progress('Health Check', 'Performing health checks', 'in_progress')
+                if not run_success:
+                    raise Exception(f"Failed to start container: {run_msg}")
+
+                result['container_name'] = container_name
+                result['port'] = host_port
+
+                # Update Application record with container details.
+                # Plain UPDATE: `application` is not read again in deploy(),
+                # so skip reconciling the in-session object with the new values
+                db.query(Application).filter(Application.id == application.id).update({
+                    'container_name': container_name,
+                    'image_name': image_name,
+                    'status': 'active',
+                    'updated_at': func.now(),   # database clock, set in the UPDATE
+                }, synchronize_session=False)
+                dep_repo.add_step(dep.id, 7, 'Container Started', 'success',
+                                  message=container_name)
+                dep_repo.checkpoint()
+                update_progress('Container Deployment',
+                               f"Container running: {container_name}", 'success')
+
+                # ── Step 8.5: Configure NGINX ─────────────────────────────────
+                if nginx_manager:
+                    update_progress('NGINX Configuration',
+                                   'Configuring NGINX reverse proxy', 'in_progress')
+
+                    site_ok, site_msg = nginx_future.result()
+                    if not site_ok:
+                        raise Exception(site_msg)
+
+                    rl_ok, rl_msg = nginx_manager.reload_nginx()
+                    if not rl_ok:
+                        raise Exception(f"NGINX reload failed: {rl_msg}")
+
+                    dep_repo.add_step(dep.id, 8, 'NGINX Configured', 'success')
+                    update_progress('NGINX Configuration', 'NGINX configured', 'success')
+                    health_check_port = 80
+                else:
+                    health_check_port = host_port
 
-            health_checker = HealthChecker(instance_info['public_ip'], health_check_port)
-            is_healthy, health_msg = health_checker.wait_for_healthy(
-                max_retries=config.HEALTH_CHECK_RETRIES,
-                retry_interval=config.HEALTH_CHECK_INTERVAL,
-            )
+                # ── Step 9: Health check ──────────────────────────────────────
+                update_progress('Health Check', 'Performing health checks', 'in_progress')
 
-            if is_healthy:
-                dep_repo.add_step(dep.id, 9, 'Health Check Passed', 'success')
-                update_progress('Health Check', 'Application is healthy', 'success')
-            else:
-                dep_repo.add_step(dep.id, 9, 'Health Check Warning', 'warning',
-                                  message=health_msg)
-                update_progress('Health Check',
-                               f"Health check warning: {health_msg}", 'warning')
-            db.commit()
+                health_checker = HealthChecker(instance_info['public_ip'], health_check_port)
+                is_healthy, health_msg = health_checker.wait_for_healthy(
+                    max_retries=config.HEALTH_CHECK_RETRIES,
+                    retry_interval=config.HEALTH_CHECK_INTERVAL,
+                )
 
-            # ── Step 10: Finalize ─────────────────────────────────────────────
-            deployment_url = (
-                f"http://{instance_info['public_ip']}/"
-                if config.ENABLE_NGINX
-                else format_deployment_url(instance_info['public_ip'], host_port)
-            )
+                if is_healthy:
+                    dep_repo.add_step(dep.id, 9, 'Health Check Passed', 'success')
+                    update_progress('Health Check', 'Application is healthy', 'success')
+                else:
+                    dep_repo.add_step(dep.id, 9, 'Health Check Warning', 'warning',
+                                      message=health_msg)
+                    update_progress('Health Check',
+                                   f"Health check warning: {health_msg}", 'warning')
+
+                # ── Step 10: Finalize ─────────────────────────────────────────
+                deployment_url = (
+                    f"http://{instance_info['public_ip']}/"
+                    if config.ENABLE_NGINX
+                    else format_deployment_url(instance_info['public_ip'], host_port)
+                )
 
-            result['url']           = deployment_url
-            result['nginx_enabled'] = config.ENABLE_NGINX
-            result['success']       = True
-            result['end_time']      = datetime.now().isoformat()
+                result['url']           = deployment_url
+                result['nginx_enabled'] = config.ENABLE_NGINX
+                result['success']       = True
+                result['end_time']      = datetime.now().isoformat()
 
-            # Persist success + URL to DB
-            dep_repo.mark_success(dep.id, deployment_url)
-            app_repo.update_last_deployed(application.id)
-            db.commit()
+                # Persist success + URL to DB
+                dep_repo.mark_success(dep.id, deployment_url)
+                app_repo.update_last_deployed(application.id)
 
-            # Close SSH connections
-            docker_manager.close()
-            github_manager.close()
-            if nginx_manager:
-                nginx_manager.close()
+                update_progress('Deployment Complete',
+                               'Application deployed successfully', 'success',
+                               {'url': deployment_url})
 
-            update_progress('Deployment Complete',
-                           'Application deployed successfully', 'success',
-                           {'url': deployment_url})
-
-            logger.info('[OK] Deployment %s completed: %s', dep.short_id, deployment_url)
-            return result
+                logger.info('[OK] Deployment %s completed: %s', dep.short_id, deployment_url)
+                return result
 
         # ─────────────────────────────────────────────────────────────────────
         # Failure path
@@ -417,46 +463,165 @@ class DeploymentOrchestrator:
             result['error']    = error_msg
             result['end_time'] = datetime.now().isoformat()
 
+            # Partial progress was already saved by deployment_session();
+            # rollback only clears a session left broken by a DB error.
             try:
-                db.rollback()   # discard any uncommitted buffered writes
-                if dep:
-                    dep_repo.mark_failed(dep.id, error_msg)
-                    db.commit()
+                db.rollback()
             except Exception as db_err:
-                logger.error('DB error while recording failure: %s', db_err)
+                logger.error('DB error while rolling back: %s', db_err)
 
             # Attempt EC2 cleanup
             if 'instance_id' in result:
                 try:
-                    update_progress('Cleanup', 'Cleaning up failed deployment', 'in_progress')
-                    # Uncomment below to auto-terminate on failure:
-                    # self.aws_manager.terminate_instance(result['instance_id'])
-                    update_progress('Cleanup', 'Cleanup noted (instance kept for debugging)', 'success')
+                    if config.TERMINATE_ON_FAILURE and dep:
+                        _cleanup_pool.submit(
+                            contextvars.copy_context().run,
+                            self._cleanup_failed, result['instance_id'], dep.id)
+                        update_progress('Cleanup',
+                                       f"Terminating instance {result['instance_id']} in the background",
+                                       'success')
+                    else:
+                        update_progress('Cleanup', 'Cleanup noted (instance kept for debugging)', 'success')
                 except Exception as cleanup_err:
                     logger.error('Cleanup failed: %s', cleanup_err)
 
+            # Record the failure (and the cleanup log lines) in one commit
+            try:
+                if dep:
+                    dep_repo.mark_failed(dep.id, error_msg)
+                    db.commit()
+            except Exception as db_err:
+                logger.error('DB error while recording failure: %s', db_err)
+
             return result
 
         finally:
+            # A step that failed while side work was in flight: let it finish
+            # before its SSH connection is released under it
+            if side_pool:
+                side_pool.shutdown(wait=True, cancel_futures=True)
+            # Release SSH connections (the managers share one per host)
+            for manager in (docker_manager, github_manager, nginx_manager):
+                if manager:
+                    try:
+                        manager.close()
+                    except Exception as close_err:
+                        logger.warning('Error closing SSH connection: %s', close_err)
+            # Callers (API response, Socket.IO event) get ISO timestamps
+            for entry in result['steps']:
+                entry['timestamp'] = datetime.fromtimestamp(entry['timestamp']).isoformat()
+            if dep:
+                # Final status is committed: drop cached in-progress views
+                self._invalidate_queries(dep.short_id, dep.id)
             clear_deployment_context()
             db.close()   # always return connection to pool
 
+    @staticmethod
+    def _prepare_nginx_site(nginx_manager, site_name: str, proxy_port: int):
+        """
+        Write and enable the NGINX site for a deployment (no reload).
+
+        Returns:
+            Tuple of (success, error message)
+        """
+        cfg_ok, cfg_msg = nginx_manager.create_site_config(
+            app_name=site_name,
+            proxy_port=proxy_port,
+            server_name='_',
+        )
+        if not cfg_ok:
+            return False, f"NGINX config failed: {cfg_msg}"
+
+        # One deploy is one batch: also test the whole tree once here, so a
+        # site the real nginx.conf rejects fails the deploy before reload
+        en_ok, en_msg = nginx_manager.enable_site(site_name, full_validate=True)
+        if not en_ok:
+            return False, f"NGINX enable failed: {en_msg}"
+        return True, ''
+
+    def _cleanup_failed(self, aws_instance_id: str, dep_id: str):
+        """
+        Terminate a failed deployment's instance (runs on _cleanup_pool).
+
+        Uses its own DB session: the deploy() session is closed by the time
+        this runs, and sessions must not be shared across threads.
+        """
+        db = SessionLocal()
+        try:
+            dep_repo = DeploymentRepository(db)
+            try:
+                self.aws_manager.terminate_instance(aws_instance_id)
+            except Exception as e:
+                logger.error('Cleanup: could not terminate %s: %s', aws_instance_id, e)
+                dep_repo.add_log(dep_id, f"[Cleanup] Failed to terminate {aws_instance_id}: {e}",
+                                 level='ERROR')
+            else:
+                instance = EC2InstanceRepository(db).get_by_aws_id(aws_instance_id)
+                if instance:
+                    EC2InstanceRepository(db).update_status(instance.id, 'terminated')
+                dep_repo.add_log(dep_id, f"[Cleanup] Instance {aws_instance_id} terminated")
+            dep_repo.flush_pending()
+            db.commit()
+        except Exception as e:
+            logger.error('Cleanup: DB error for deployment %s: %s', dep_id[:8], e)
+            db.rollback()
+        finally:
+            db.close()
+
     # ─────────────────────────────────────────────────────────────────────────
     # Query methods — now read from DB instead of in-memory dict
     # ─────────────────────────────────────────────────────────────────────────
+    def _cache_get(self, key) -> Optional[Any]:
+        with self._query_cache_lock:
+            hit = self._query_cache.get(key)
+            if hit is None:
+                return None
+            if time.monotonic() >= hit[0]:
+                del self._query_cache[key]
+                return None
+            return hit[1]
+
+    def _cache_put(self, key, ttl: float, value: Any):
+        with self._query_cache_lock:
+            if len(self._query_cache) >= _QUERY_CACHE_MAX:
+                del self._query_cache[next(iter(self._query_cache))]
+            self._query_cache[key] = (time.monotonic() + ttl, value)
+
+    def _invalidate_queries(self, *deployment_ids: str):
+        """Forget cached status for these ids and the cached list."""
+        with self._query_cache_lock:
+            self._query_cache.pop('list', None)
+            for dep_id in deployment_ids:
+                self._query_cache.pop(('status', dep_id), None)
+
     def get_deployment_status(self, deployment_id: str) -> Optional[Dict]:
         """
         Get status of a deployment by short_id or full UUID.
         Returns None if not found.
+
+        Cached for STATUS_CACHE_TTL seconds (TERMINAL_STATUS_CACHE_TTL once
+        the deployment has succeeded or failed); treat the dict as read-only.
         """
+        cached = self._cache_get(('status', deployment_id))
+        if cached is not None:
+            return cached
+
+        status = self._load_deployment_status(deployment_id)
+        if status is not None:
+            ttl = (TERMINAL_STATUS_CACHE_TTL if status['status'] in _TERMINAL_STATUSES
+                   else STATUS_CACHE_TTL)
+            self._cache_put(('status', deployment_id), ttl, status)
+        return status
+
+    def _load_deployment_status(self, deployment_id: str) -> Optional[Dict]:
         db = SessionLocal()
         try:
             repo = DeploymentRepository(db)
             # Try short_id first (8 chars), then full UUID
             if len(deployment_id) == 8:
-                dep = repo.get_by_short_id(deployment_id)
+                dep = repo.get_by_short_id(deployment_id, with_details=True)
             else:
-                dep = repo.get_by_id(deployment_id)
+                dep = repo.get_by_id(deployment_id, with_details=True)
 
             if not dep:
                 return None
@@ -487,7 +652,16 @@ class DeploymentOrchestrator:
         """
         List all deployments from the database (most recent first).
         Returns same shape as before for API backward-compatibility.
+        Cached for STATUS_CACHE_TTL seconds; treat the list as read-only.
         """
+        cached = self._cache_get('list')
+        if cached is not None:
+            return cached
+        deployments = self._load_deployments()
+        self._cache_put('list', STATUS_CACHE_TTL, deployments)
+        return deployments
+
+    def _load_deployments(self) -> list:
         db = SessionLocal()
         try:
             repo = DeploymentRepository(db)
@@ -4,13 +4,48 @@ Monitors container and application health.
 """
 
 import logging
+import random
+import threading
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Dict, Optional, Tuple
 from ..core.utils import check_url_health
 
 logger = logging.getLogger(__name__)
 
+# Backoff between health probes: 0.5s, 1s, 2s, ... capped at retry_interval
+_BACKOFF_BASE = 0.5
+_BACKOFF_JITTER = 0.3
+# The proxy answered but the app behind it is still starting: probe again soon
+_WARMING_STATUS = (502, 503)
+_WARMING_DELAY = 1.0
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _http_session() -> requests.Session:
+    """
+    Process-wide HTTP session for health-check traffic.
+    
+    Keeps connections alive between retries of one deployment (and across
+    deployments' HealthCheckers), so a retry is one request on an open
+    socket instead of a new TCP handshake. Targets are instance IPs, so
+    there is no DNS lookup to cache.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=100, pool_maxsize=20)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
 
 class HealthChecker:
     """Monitors health of deployed applications."""
@@ -28,6 +63,8 @@ class HealthChecker:
         self.port = port
         self.protocol = protocol
         self.base_url = f"{protocol}://{public_ip}:{port}"
+        # endpoint -> full URL, built once per endpoint instead of per probe
+        self._urls: Dict[str, str] = {}
     
     def check_container_health(self, docker_manager, container_name: str) -> Tuple[bool, Dict]:
         """
@@ -67,11 +104,13 @@ class HealthChecker:
             Tuple of (is_healthy, response_dict)
         """
         try:
-            url = f"{self.base_url}{endpoint}"
-            logger.info(f"Checking application health: {url}")
+            url = self._urls.get(endpoint)
+            if url is None:
+                url = self._urls[endpoint] = f"{self.base_url}{endpoint}"
+            logger.debug("Checking application health: %s", url)
             
             start_time = time.time()
-            response = requests.get(url, timeout=timeout)
+            response = _http_session().get(url, timeout=timeout)
             response_time = time.time() - start_time
             
             is_healthy = response.status_code == expected_status
@@ -83,18 +122,17 @@ class HealthChecker:
                 'healthy': is_healthy
             }
             
-            if is_healthy:
-                logger.info(f"Application is healthy (status: {response.status_code}, time: {response_time:.3f}s)")
-            else:
-                logger.warning(f"Application health check failed (status: {response.status_code})")
+            # Per-probe detail; wait_for_healthy and comprehensive_health_check
+            # log the outcome once
+            logger.debug("Health probe %s -> %d in %.3fs", url, response.status_code, response_time)
             
             return is_healthy, result
             
         except requests.exceptions.Timeout:
-            logger.error(f"Health check timed out after {timeout}s")
+            logger.debug("Health check timed out after %ss", timeout)
             return False, {'error': 'timeout', 'timeout': timeout}
         except requests.exceptions.ConnectionError:
-            logger.error("Failed to connect to application")
+            logger.debug("Failed to connect to application")
             return False, {'error': 'connection_error'}
         except Exception as e:
             logger.error(f"Error checking application health: {str(e)}")
@@ -107,31 +145,59 @@ class HealthChecker:
         """
         Wait for application to become healthy.
         
+        The budget is max_retries * retry_interval seconds, as before, but
+        probes back off exponentially (0.5s, 1s, 2s, ... capped at
+        retry_interval, plus jitter) instead of sleeping the full interval
+        after every miss, so an app that comes up a second after the first
+        probe is noticed within about a second. A 502/503 (something is
+        listening, the app is warming up) keeps the next delay short.
+        
         Args:
-            max_retries: Maximum number of health check attempts
-            retry_interval: Time between retries in seconds
+            max_retries: Number of retry intervals to wait in total
+            retry_interval: Longest delay between attempts in seconds
             endpoint: Health check endpoint
             
         Returns:
             Tuple of (is_healthy, message)
         """
-        logger.info(f"Waiting for application to become healthy (max {max_retries} attempts)")
+        budget = max_retries * retry_interval
+        logger.info("Probing %s%s for up to %ss", self.base_url, endpoint, budget)
         
-        for attempt in range(1, max_retries + 1):
-            logger.info(f"Health check attempt {attempt}/{max_retries}")
-            
-            is_healthy, result = self.check_application_health(endpoint)
+        started = time.monotonic()
+        deadline = started + budget
+        attempt = 0
+        while True:
+            attempt += 1
+            logger.debug("Health check attempt %d", attempt)
+            
+            # Never wait longer for one attempt than the interval it has
+            remaining = deadline - time.monotonic()
+            is_healthy, result = self.check_application_health(
+                endpoint, timeout=max(1, min(10, retry_interval, remaining)))
             
             if is_healthy:
-                success_msg = f"Application is healthy after {attempt} attempts"
+                success_msg = (f"Application is healthy after {attempt} attempts "
+                               f"in {time.monotonic() - started:.1f}s")
                 logger.info(success_msg)
                 return True, success_msg
             
-            if attempt < max_retries:
-                logger.info(f"Application not ready, waiting {retry_interval}s before retry...")
-                time.sleep(retry_interval)
+            delay = min(retry_interval, _BACKOFF_BASE * 2 ** (attempt - 1))
+            if result.get('status_code') in _WARMING_STATUS:
+                delay = min(delay, _WARMING_DELAY)
+            delay += random.uniform(0, _BACKOFF_JITTER)
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            delay = min(delay, remaining)
+            logger.debug("Application not ready, waiting %.1fs before retry...", delay)
+            time.sleep(delay)
         
-        error_msg = f"Application failed to become healthy after {max_retries} attempts"
+        # The summary (with the last probe's outcome) is what reaches the
+        # deployment's DB log via the orchestrator's progress update
+        last = result.get('status_code') or result.get('error', 'unknown')
+        error_msg = (f"Application failed to become healthy after {attempt} attempts "
+                     f"({budget}s, last result: {last})")
         logger.error(error_msg)
         return False, error_msg
     
@@ -152,11 +218,12 @@ class HealthChecker:
         """
         logger.info("Performing comprehensive health check")
         
-        # Check container health
-        container_healthy, container_status = self.check_container_health(docker_manager, container_name)
-        
-        # Check application health
-        app_healthy, app_status = self.check_application_health(endpoint)
+        # The two checks are independent waits (SSH vs HTTP): run the
+        # container check on a worker thread while the HTTP request runs here
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            container_future = pool.submit(self.check_container_health, docker_manager, container_name)
+            app_healthy, app_status = self.check_application_health(endpoint)
+            container_healthy, container_status = container_future.result()
         
         overall_healthy = container_healthy and app_healthy
         
@@ -4,15 +4,65 @@ This is a sample application to test the Automated Deployment Framework
 """
 
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+import functools
 import re
 
+try:
+    import orjson
+except ImportError:   # e.g. PyPy (no orjson wheels): Flask's stdlib-json provider
+    orjson = None
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (C) instead of the stdlib json module."""
+    
+    option = orjson.OPT_SORT_KEYS if orjson else 0   # same key order as Flask's default provider
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Serialize straight to bytes (no str round trip)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.option),
+                                        mimetype='application/json')
+
+
 app = Flask(__name__)
+if orjson:
+    app.json = ORJSONProvider(app)
 CORS(app)
 
 # Simple sentiment analysis (keyword-based)
-POSITIVE_WORDS = {'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'love', 'best', 'awesome', 'happy'}
-NEGATIVE_WORDS = {'bad', 'terrible', 'awful', 'horrible', 'worst', 'hate', 'poor', 'sad', 'disappointing', 'useless'}
+POSITIVE_WORDS = frozenset({'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'love', 'best', 'awesome', 'happy'})
+NEGATIVE_WORDS = frozenset({'bad', 'terrible', 'awful', 'horrible', 'worst', 'hate', 'poor', 'sad', 'disappointing', 'useless'})
+
+# One table for both vocabularies: word -> +1 (positive) / -1 (negative)
+_SENTIMENT = {**dict.fromkeys(POSITIVE_WORDS, 1), **dict.fromkeys(NEGATIVE_WORDS, -1)}
+
+# Largest number of texts accepted by /analyze_batch in one request
+MAX_BATCH_SIZE = 1000
+# Longest text accepted (characters); longer input is rejected before analysis
+MAX_TEXT_LENGTH = 100_000
+
+# Repeated inputs (probes, retries, dashboards) are answered from an LRU
+# cache; longer texts are analyzed directly so the cache stays small
+RESULT_CACHE_SIZE = 4096
+CACHE_MAX_TEXT_LEN = 1000
+
+# Matches only whole-word keywords: \b on both sides means the match is an
+# entire \w+ run, so this finds exactly the words a \w+ tokenizer would
+# count, but the scan runs in the regex engine and returns just the hits.
+# Compiled once at import instead of looked up in re's cache on every request.
+_KEYWORD_PATTERN = r'\b(?:' + '|'.join(sorted(_SENTIMENT)) + r')\b'
+_KEYWORD_RE = re.compile(_KEYWORD_PATTERN)
+# Same matches for ASCII-only text, without Unicode word-class lookups
+_KEYWORD_RE_ASCII = re.compile(_KEYWORD_PATTERN, re.ASCII)
 
 
 def analyze_sentiment(text):
@@ -25,54 +75,141 @@ def analyze_sentiment(text):
     Returns:
         Dictionary with sentiment and score
     """
-    # Convert to lowercase and split into words
-    words = re.findall(r'\w+', text.lower())
-    
-    # Count positive and negative words
-    positive_count = sum(1 for word in words if word in POSITIVE_WORDS)
-    negative_count = sum(1 for word in words if word in NEGATIVE_WORDS)
+    # Only sentiment words come back from the scan; look up their polarity.
+    # isascii() is a flag check on CPython strings, not a scan.
+    keyword_re = _KEYWORD_RE_ASCII if text.isascii() else _KEYWORD_RE
+    hits = [_SENTIMENT[word] for word in keyword_re.findall(text.lower())]
+    positive_count = hits.count(1)
+    negative_count = len(hits) - positive_count
     
-    # Calculate sentiment
+    # Calculate sentiment (neutral, the common case for short texts, is a
+    # constant: no division or rounding)
     if positive_count > negative_count:
         sentiment = 'positive'
-        score = positive_count / (positive_count + negative_count + 1)
+        score = round(positive_count / (positive_count + negative_count + 1), 2)
     elif negative_count > positive_count:
         sentiment = 'negative'
-        score = negative_count / (positive_count + negative_count + 1)
+        score = round(negative_count / (positive_count + negative_count + 1), 2)
     else:
         sentiment = 'neutral'
         score = 0.5
     
     return {
         'sentiment': sentiment,
-        'score': round(score, 2),
+        'score': score,
         'positive_words': positive_count,
         'negative_words': negative_count
     }
 
 
+_cached_analyze = functools.lru_cache(maxsize=RESULT_CACHE_SIZE)(analyze_sentiment)
+
+
+def analyze_text(text):
+    """
+    Sentiment result for `text` (with the text echoed), from the cache when possible.
+    
+    Args:
+        text: Input text to analyze
+        
+    Returns:
+        New dictionary the caller may modify
+    """
+    if len(text) <= CACHE_MAX_TEXT_LEN:
+        result = dict(_cached_analyze(text))   # copy: the cached dict is shared
+    else:
+        result = analyze_sentiment(text)
+    result['text'] = text
+    return result
+
+
+# Responses of / and /health never change: serialized once at import
+_HOME_BODY = app.json.dumps({
+    'service': 'Sentiment Analysis API',
+    'version': '1.0.0',
+    'status': 'running',
+    'endpoints': {
+        '/': 'API information',
+        '/health': 'Health check',
+        '/analyze': 'Analyze sentiment (POST)',
+        '/analyze_batch': 'Analyze sentiment of a list of texts (POST)'
+    }
+}).encode()
+_HEALTH_BODY = app.json.dumps({
+    'status': 'healthy',
+    'service': 'sentiment-analysis'
+}).encode()
+
+
 @app.route('/')
 def home():
     """Home endpoint with API information."""
-    return jsonify({
-        'service': 'Sentiment Analysis API',
-        'version': '1.0.0',
-        'status': 'running',
-        'endpoints': {
-            '/': 'API information',
-            '/health': 'Health check',
-            '/analyze': 'Analyze sentiment (POST)'
-        }
-    })
+    response = app.response_class(_HOME_BODY, mimetype='application/json')
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
 
 
 @app.route('/health')
 def health():
-    """Health check endpoint."""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'sentiment-analysis'
-    })
+    """Health check endpoint (never cached: it must reach the app)."""
+    return app.response_class(_HEALTH_BODY, mimetype='application/json')
+
+
+def parse_analyze_request(data):
+    """
+    Validate an /analyze request body.
+    
+    Shared with the ASGI variant (asgi_app.py) so both apps accept the same input.
+    
+    Args:
+        data: Decoded JSON body
+        
+    Returns:
+        Tuple of (text, None), or (None, (error message, HTTP status))
+    """
+    if not data or 'text' not in data:
+        return None, ('Missing "text" field in request body', 400)
+    
+    text = data['text']
+    
+    # isspace() stops at the first non-space character (no stripped copy)
+    if not text or text.isspace():
+        return None, ('Text cannot be empty', 400)
+    
+    if len(text) > MAX_TEXT_LENGTH:
+        return None, (f'Text longer than {MAX_TEXT_LENGTH} characters', 413)
+    
+    return text, None
+
+
+def parse_batch_request(data):
+    """
+    Validate an /analyze_batch request body.
+    
+    Args:
+        data: Decoded JSON body
+        
+    Returns:
+        Tuple of (texts, None), or (None, (error message, HTTP status))
+    """
+    if not data or 'texts' not in data:
+        return None, ('Missing "texts" field in request body', 400)
+    
+    texts = data['texts']
+    
+    if not isinstance(texts, list) or not texts:
+        return None, ('"texts" must be a non-empty list', 400)
+    
+    if len(texts) > MAX_BATCH_SIZE:
+        return None, (f'At most {MAX_BATCH_SIZE} texts per request', 400)
+    
+    for index, text in enumerate(texts):
+        if not isinstance(text, str) or not text or text.isspace():
+            return None, (f'Text at index {index} must be a non-empty string', 400)
+        if len(text) > MAX_TEXT_LENGTH:
+            return None, (f'Text at index {index} longer than {MAX_TEXT_LENGTH} characters', 413)
+    
+    return texts, None
 
 
 @app.route('/analyze', methods=['POST'])
@@ -86,25 +223,47 @@ def analyze():
     }
     """
     try:
-        data = request.get_json()
+        text, error = parse_analyze_request(request.get_json())
         
-        if not data or 'text' not in data:
+        if error:
             return jsonify({
-                'error': 'Missing "text" field in request body'
-            }), 400
+                'error': error[0]
+            }), error[1]
+        
+        # Perform sentiment analysis
+        result = analyze_text(text)
         
-        text = data['text']
+        return jsonify(result)
         
-        if not text or len(text.strip()) == 0:
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+
+@app.route('/analyze_batch', methods=['POST'])
+def analyze_batch():
+    """
+    Analyze sentiment of several texts in one request.
+    
+    Request body:
+    {
+        "texts": ["First text", "Second text"]
+    }
+    
+    Results are returned in the order of the input texts.
+    """
+    try:
+        texts, error = parse_batch_request(request.get_json())
+        
+        if error:
             return jsonify({
-                'error': 'Text cannot be empty'
-            }), 400
+                'error': error[0]
+            }), error[1]
         
-        # Perform sentiment analysis
-        result = analyze_sentiment(text)
-        result['text'] = text
+        results = [analyze_text(text) for text in texts]
         
-        return jsonify(result)
+        return jsonify({'results': results})
         
     except Exception as e:
         return jsonify({
@@ -0,0 +1,111 @@
+"""
+Example ML Application - ASGI variant of the Sentiment Analysis API
+Same routes and responses as app.py, served by Starlette on uvicorn
+(uvloop + httptools) instead of Flask/WSGI.
+
+Run with:
+    uvicorn asgi_app:app --host 0.0.0.0 --port 8000 --workers 2 --loop uvloop --http httptools
+"""
+
+import json
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
+from werkzeug.exceptions import BadRequest, UnsupportedMediaType
+
+# Analysis, validation and the constant bodies are shared with the Flask app
+from app import (
+    _HEALTH_BODY,
+    _HOME_BODY,
+    analyze_text,
+    orjson,
+    parse_analyze_request,
+    parse_batch_request,
+)
+
+
+if orjson:
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    _loads = orjson.loads
+else:
+    def _dumps(obj):
+        return json.dumps(obj, sort_keys=True).encode()
+    _loads = json.loads
+
+
+def _json_response(obj, status_code=200):
+    return Response(_dumps(obj), status_code=status_code, media_type='application/json')
+
+
+async def _read_json(request):
+    """
+    Decoded JSON body, rejected the way Flask's request.get_json() rejects it.
+    
+    Raises the same werkzeug exceptions, so the routes' `except Exception`
+    turns a wrong Content-Type or invalid JSON into the same 500 response
+    app.py gives.
+    """
+    mimetype = request.headers.get('content-type', '').partition(';')[0].strip().lower()
+    if not (mimetype == 'application/json'
+            or mimetype.startswith('application/') and mimetype.endswith('+json')):
+        raise UnsupportedMediaType(
+            "Did not attempt to load JSON data because the request"
+            " Content-Type was not 'application/json'.")
+    try:
+        return _loads(await request.body())
+    except ValueError:
+        raise BadRequest()
+
+
+async def home(request):
+    """Home endpoint with API information."""
+    return Response(_HOME_BODY, media_type='application/json',
+                    headers={'Cache-Control': 'public, max-age=300'})
+
+
+async def health(request):
+    """Health check endpoint."""
+    return Response(_HEALTH_BODY, media_type='application/json')
+
+
+async def analyze(request):
+    """Analyze sentiment of input text (same contract as app.py's /analyze)."""
+    try:
+        text, error = parse_analyze_request(await _read_json(request))
+
+        if error:
+            return _json_response({'error': error[0]}, error[1])
+
+        return _json_response(analyze_text(text))
+
+    except Exception as e:
+        return _json_response({'error': str(e)}, 500)
+
+
+async def analyze_batch(request):
+    """Analyze sentiment of several texts (same contract as app.py's /analyze_batch)."""
+    try:
+        texts, error = parse_batch_request(await _read_json(request))
+
+        if error:
+            return _json_response({'error': error[0]}, error[1])
+
+        return _json_response({'results': [analyze_text(text) for text in texts]})
+
+    except Exception as e:
+        return _json_response({'error': str(e)}, 500)
+
+
+app = Starlette(
+    routes=[
+        Route('/', home),
+        Route('/health', health),
+        Route('/analyze', analyze, methods=['POST']),
+        Route('/analyze_batch', analyze_batch, methods=['POST']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+)